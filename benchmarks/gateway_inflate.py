@@ -0,0 +1,138 @@
+"""
+Compares gateway frame throughput of the legacy bytearray inflater
+with :class:`quant.impl.core.compression.ZlibStreamInflater`.
+
+Usage::
+
+    python benchmarks/gateway_inflate.py [corpus] [--codec json|orjson|ujson|auto|none] [--rounds N]
+
+``corpus`` is a file of length-prefixed raw websocket frames
+(4 byte big-endian length followed by the compressed frame).
+When omitted a synthetic MESSAGE_CREATE/GUILD_CREATE corpus is generated.
+``--codec none`` measures inflating only. Rounds of both paths are interleaved
+and the best one is reported, the timings are noisy on shared machines.
+
+On the synthetic corpus (best of 25 rounds) streaming was 1.1-1.2x as fast as legacy
+with ``--codec none``, 1.1-1.17x with stdlib json (one noisy run gave 0.91x)
+and 1.2-1.3x with orjson. Pass ``compression_stats=True`` to :class:`Client`
+only when needed, timing every frame gives most of this back.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import struct
+import time
+import zlib
+from typing import Any, Callable, Dict, List
+
+from quant.impl.core.compression import ZlibStreamInflater, ZLIB_SUFFIX
+from quant.utils.json_codec import get_codec
+
+_FRAME_HEADER = struct.Struct(">I")
+
+LoadsT = Callable[[bytes | str], Any]
+
+
+def load_corpus(path: str) -> List[bytes]:
+    frames = []
+    with open(path, "rb") as file:
+        while header := file.read(_FRAME_HEADER.size):
+            (length,) = _FRAME_HEADER.unpack(header)
+            frames.append(file.read(length))
+
+    return frames
+
+
+def synthetic_corpus(count: int = 20_000) -> List[bytes]:
+    compressor = zlib.compressobj()
+    frames = []
+
+    for sequence in range(count):
+        if sequence % 500 == 0:
+            data = {
+                "id": str(sequence), "name": "guild",
+                "members": [{"user": {"id": str(i), "username": f"user{i}"}, "roles": []} for i in range(1000)]
+            }
+            event_name = "GUILD_CREATE"
+        else:
+            data = {
+                "id": str(sequence), "channel_id": "1", "content": "hello" * 20,
+                "author": {"id": "2", "username": "someone"}
+            }
+            event_name = "MESSAGE_CREATE"
+
+        payload = json.dumps({"op": 0, "s": sequence, "t": event_name, "d": data}).encode()
+        frame = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        # Split big messages into several websocket frames like Discord does
+        if len(frame) > 4096:
+            frames.extend(frame[i:i + 4096] for i in range(0, len(frame), 4096))
+        else:
+            frames.append(frame)
+
+    return frames
+
+
+def legacy_decoder(loads: LoadsT | None) -> Callable[[bytes], Any]:
+    state = {"buffer": bytearray(), "inflator": zlib.decompressobj()}
+
+    def decode(message: bytes) -> Any:
+        state["buffer"].extend(message)
+
+        if len(message) < 4 or message[-4:] != ZLIB_SUFFIX:
+            return
+
+        inflated = state["inflator"].decompress(state["buffer"])
+        state["buffer"] = bytearray()
+        return loads(inflated.decode("utf8")) if loads is not None else inflated
+
+    return decode
+
+
+def streaming_decoder(loads: LoadsT | None) -> Callable[[bytes], Any]:
+    feed = ZlibStreamInflater().feed
+
+    def decode(message: bytes) -> Any:
+        inflated = feed(message)
+        if inflated is None or loads is None:
+            return inflated
+
+        return loads(inflated)
+
+    return decode
+
+
+def run(decoder: Callable[[bytes], Any], frames: List[bytes]) -> float:
+    started = time.perf_counter()
+
+    for frame in frames:
+        decoder(frame)
+
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus", nargs="?")
+    parser.add_argument("--codec", default="json")
+    parser.add_argument("--rounds", type=int, default=25)
+    args = parser.parse_args()
+
+    frames = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    loads = get_codec(args.codec).loads if args.codec != "none" else None
+    print(f"{len(frames)} frames, {sum(map(len, frames)) / 1024 / 1024:.1f} MiB compressed, codec: {args.codec}")
+
+    timings: Dict[str, List[float]] = {"legacy": [], "streaming": []}
+    for _ in range(args.rounds):
+        timings["legacy"].append(run(legacy_decoder(loads), frames))
+        timings["streaming"].append(run(streaming_decoder(loads), frames))
+
+    for name, elapsed in timings.items():
+        print(f"{name:<10} {len(frames) / min(elapsed):>12,.0f} frames/s (best of {args.rounds})")
+
+    print(f"speedup: {min(timings['legacy']) / min(timings['streaming']):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,7 +50,7 @@ class MusicModule:
         voice_state = self.bot.cache.get_voice_state(guild_id, ctx.author.id)
         channel_id = voice_state.channel_id
 
-        await self.bot.gateway.voice_connect(guild_id=guild_id, channel_id=channel_id)
+        await self.bot.voice_connect(guild_id=guild_id, channel_id=channel_id)
         await ctx.interaction.respond(content=f"Connected to <#{channel_id}>")
         connection = await self.bot.lavalink.wait_for_full_connection_info_insert(guild_id)
 
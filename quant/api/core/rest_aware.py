@@ -814,6 +814,12 @@ class RESTAware(ABC):
         guild_id: :class:`SnowflakeT`
         """
 
+    @abstractmethod
+    async def fetch_current_user(self) -> User:
+        """
+        Fetches the user of the bot token.
+        """
+
     @abstractmethod
     async def fetch_user(self, user_id: SnowflakeT) -> User:
         """
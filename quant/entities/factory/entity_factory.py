@@ -348,6 +348,9 @@ class EntityFactory:
             last_pin_timestamp=iso_to_datetime(payload.get("last_pin_timestamp")),
         )
 
+    def deserialize_guild_channel(self, payload: Dict) -> Channel:
+        return self._channel_converter.get(ChannelType(payload["type"]), self.deserialize_channel)(payload)
+
     def deserialize_channel(self, payload: Dict | None) -> Channel | None:
         if payload is None:
             return
@@ -709,8 +712,7 @@ class EntityFactory:
         if payload is None:
             return
 
-        channels = [self._channel_converter.get(ChannelType(c["type"]), self.deserialize_channel)(c)
-                    for c in payload.get("channels", [])]
+        channels = [self.deserialize_guild_channel(c) for c in payload.get("channels", [])]
         roles = [self.deserialize_role(role) for role in payload.get("roles", [])]
         emojis = [self.deserialize_emoji(emoji) for emoji in payload.get("emojis", [])]
 
@@ -21,18 +21,132 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import asyncio
+import collections
 import inspect
-from typing import Dict, List, TypeVar, Callable, Set, overload
+from typing import Any, Awaitable, Deque, Dict, Hashable, List, Set, Tuple, TypeVar, Callable, overload
+from traceback import print_exception
 
+from quant.impl import events
 from quant.impl.events.types import EventTypes
 from quant.entities.factory.event_factory import EventFactory, EventT
 
 EventNameT = TypeVar("EventNameT", bound=str)
 
+# Their guild ID is the "id" field
+_GUILD_EVENTS = frozenset({EventTypes.GUILD_CREATE, EventTypes.GUILD_DELETE})
+
+# Events one partition may queue before dispatch waits for it
+DEFAULT_PARTITION_SIZE = 1000
+
+
+def default_partition_key(event_name: str, details: Dict) -> Hashable:
+    """Guild ID, channel ID for DMs, ``None`` for events of neither"""
+    if event_name in _GUILD_EVENTS:
+        return details.get("id")
+
+    return details.get("guild_id") or details.get("channel_id")
+
+
+class PartitionedExecutor:
+    """Runs jobs of the same key one after another and jobs of different keys in parallel.
+
+    Every partition has its own task which exits as soon as its queue is drained,
+    so idle partitions cost nothing. :meth:`submit` waits while the partition
+    already has ``max_pending`` jobs queued.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_PARTITION_SIZE) -> None:
+        self.max_pending = max_pending
+        self._queues: Dict[Hashable, Deque[Callable[[], Awaitable[None]]]] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._not_full: Dict[Hashable, asyncio.Event] = {}
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    @property
+    def depths(self) -> Dict[Hashable, int]:
+        """Queued jobs per active partition"""
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    async def submit(self, key: Hashable, job: Callable[[], Awaitable[None]]) -> None:
+        queue = self._queues.get(key)
+
+        # A slow partition holds back the caller instead of growing without limit
+        while queue is not None and len(queue) >= self.max_pending:
+            not_full = self._not_full[key]
+            not_full.clear()
+            await not_full.wait()
+            queue = self._queues.get(key)
+
+        if queue is None:
+            queue = self._queues[key] = collections.deque()
+            self._not_full[key] = asyncio.Event()
+            self._tasks[key] = asyncio.create_task(self._drain(key, queue))
+
+        queue.append(job)
+
+    async def _drain(self, key: Hashable, queue: Deque[Callable[[], Awaitable[None]]]) -> None:
+        try:
+            while queue:
+                job = queue.popleft()
+                self._not_full[key].set()
+
+                try:
+                    await job()
+                except Exception as exception:
+                    print_exception(exception)
+        finally:
+            del self._queues[key]
+            del self._tasks[key]
+            self._not_full.pop(key).set()
+
+    def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
 
 class EventController:
-    def __init__(self, factory: EventFactory) -> None:
+    """Builds events from dispatch payloads and runs their listeners.
+
+    Parameters
+    ==========
+    factory: :class:`EventFactory`
+        Event factory with registered listeners
+    concurrent: :class:`bool`
+        Run every listener as its own task instead of awaiting them one by one
+    listener_timeout: :class:`float | None`
+        Seconds a listener may run before it's cancelled
+    max_concurrency: :class:`int | None`
+        Max listeners of one event type running at once in concurrent mode
+    partitioned: :class:`bool`
+        Run dispatch events of different partitions (guilds by default) in parallel,
+        while events of one partition keep their order
+    partition_size: :class:`int`
+        Events one partition may queue, dispatch waits for a full partition
+    partition_key: :class:`Callable[[str, Dict], Hashable]`
+        Partition of a dispatch event from its name and payload
+    """
+
+    def __init__(
+        self,
+        factory: EventFactory,
+        concurrent: bool = False,
+        listener_timeout: float | None = None,
+        max_concurrency: int | None = None,
+        partitioned: bool = False,
+        partition_key: Callable[[str, Dict], Hashable] = default_partition_key,
+        partition_size: int = DEFAULT_PARTITION_SIZE
+    ) -> None:
         self.factory = factory
+        self.partition_key = partition_key
+        self.partitions: PartitionedExecutor | None = PartitionedExecutor(partition_size) if partitioned else None
+        self.concurrent = concurrent
+        self.listener_timeout = listener_timeout
+        self.max_concurrency = max_concurrency
+        self._semaphores: Dict[type, asyncio.Semaphore] = {}
+        self._tasks: Set[asyncio.Task] = set()
         self._builtin_events = {
             EventTypes.READY_EVENT: self.factory.deserialize_ready_event,
             EventTypes.GUILD_CREATE: self.factory.deserialize_guild_create_event,
@@ -42,7 +156,7 @@ class EventController:
             EventTypes.MESSAGE_UPDATE: self.factory.deserialize_message_edit_event,
             EventTypes.VOICE_STATE_UPDATE: self.factory.deserialize_voice_state_update_event,
             EventTypes.VOICE_SERVER_UPDATE: self.factory.deserialize_voice_server_update_event,
-            EventTypes.CHANNEL_CREATE: self.factory.entity_factory.deserialize_channel,
+            EventTypes.CHANNEL_CREATE: self.factory.deserialize_channel_create_event,
             EventTypes.GUILD_MEMBER_ADD: self.factory.deserialize_guild_member_add_event,
             EventTypes.GUILD_MEMBER_REMOVE: self.factory.deserialize_guild_member_remove_event
         }
@@ -58,30 +172,139 @@ class EventController:
             if member[0].startswith(event_func_prefix)
         ]
 
+        # Event class -> its listeners
+        self._callbacks: Dict[type, Tuple[Callable, ...]] = {}
+        # Dispatch event name -> (deserializer, listeners of the event it builds)
+        self._dispatch_table: Dict[str, Tuple[Callable[[Dict], Any], Tuple[Callable, ...]]] = {}
+
+        self.compile()
+        self.factory.on_listeners_changed(self.compile)
+
+    def compile(self) -> None:
+        """Rebuilds the dispatch table, called whenever a listener is added"""
+        self._callbacks = {
+            event: tuple(callbacks)
+            for event, callbacks in self.factory.added_listeners.items()
+        }
+        self._dispatch_table = {
+            event_name: (
+                getattr(self, "when_" + event_name.lower()),
+                self._callbacks.get(self.factory.event_class(event_name), ())
+            )
+            for event_name in self.available
+        }
+
     @overload
-    async def dispatch(self, event: EventT) -> None:
+    async def dispatch(self, event: EventT, *, partition: Hashable | None = None) -> None:
         ...
 
     @overload
     async def dispatch(self, event_name: str, details: Dict) -> None:
         ...
 
-    async def dispatch(self, *args) -> None:
+    async def dispatch(self, *args, partition: Hashable | None = None) -> None:
         if len(args) == 1:
             event = args[0]
-            event_callbacks = self.factory.added_listeners.get(type(event))
+            callbacks = self._callbacks.get(type(event), ())
+
+            # Ordered with the dispatch events of this partition, e.g. GuildAvailableEvent after GUILD_CREATE
+            if self.partitions is not None and partition is not None and event is not None:
+                await self.partitions.submit(partition, lambda: self._run_partitioned(callbacks, event))
+                return
 
-            if event_callbacks is not None:
-                for event_callback in event_callbacks:
-                    await event_callback(event)
+            await self._call_listeners(callbacks, event)
 
             if event is not None:
                 await event.call()
 
         if len(args) == 2:
             event_name, details = args
-            if event_name not in self.available:
+            entry = self._dispatch_table.get(event_name)
+            if entry is None:
+                return
+
+            deserializer, event_callbacks = entry
+            # Nobody listens, so don't build the event at all
+            if not event_callbacks:
                 return
 
-            event = getattr(self, 'when_' + event_name.lower())
-            await self.dispatch(event(details))
+            event = deserializer(details)
+
+            if self.partitions is not None:
+                # Built now so it reflects the cache at receive time, listeners run in partition order
+                await self.partitions.submit(
+                    self.partition_key(event_name, details),
+                    lambda: self._run_partitioned(event_callbacks, event)
+                )
+                return
+
+            await self._call_listeners(event_callbacks, event)
+            await event.call()
+
+    async def _run_partitioned(self, callbacks: Tuple[Callable, ...], event: EventT) -> None:
+        # Next event of the partition waits for every listener of this one
+        if self.concurrent:
+            await asyncio.gather(*(self._run_listener(callback, event) for callback in callbacks))
+        else:
+            await self._call_listeners(callbacks, event)
+
+        await event.call()
+
+    @property
+    def partition_depths(self) -> Dict[Hashable, int]:
+        """Queued events per active partition, empty when partitioned dispatch is disabled"""
+        if self.partitions is None:
+            return {}
+
+        return self.partitions.depths
+
+    async def _call_listeners(self, callbacks: Tuple[Callable, ...], event: EventT) -> None:
+        if not self.concurrent:
+            for callback in callbacks:
+                await self._run_listener(callback, event)
+
+            return
+
+        for callback in callbacks:
+            task = asyncio.create_task(self._run_listener(callback, event))
+            # Keep a reference, otherwise the task may be garbage collected mid-run
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_listener(self, callback: Callable, event: EventT) -> None:
+        semaphore = None
+        if self.concurrent and self.max_concurrency is not None:
+            semaphore = self._semaphores.get(type(event))
+            if semaphore is None:
+                semaphore = self._semaphores[type(event)] = asyncio.Semaphore(self.max_concurrency)
+
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    await asyncio.wait_for(callback(event), self.listener_timeout)
+            else:
+                await asyncio.wait_for(callback(event), self.listener_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exception:
+            if isinstance(exception, asyncio.TimeoutError):
+                exception = asyncio.TimeoutError(
+                    f"Listener {getattr(callback, '__qualname__', callback)} "
+                    f"timed out after {self.listener_timeout} seconds"
+                )
+
+            if isinstance(event, events.QuantExceptionEvent):
+                print_exception(exception)
+                return
+
+            await self.report_exception(exception)
+
+    async def report_exception(self, exception: Exception, context: Any = None) -> None:
+        """Dispatches :class:`QuantExceptionEvent`, prints the traceback if nobody listens to it"""
+        if not self._callbacks.get(events.QuantExceptionEvent):
+            print_exception(exception)
+            return
+
+        await self.dispatch(
+            self.factory.build_from_class(events.QuantExceptionEvent(), context, exception)
+        )
@@ -24,6 +24,7 @@ SOFTWARE.
 from __future__ import annotations
 
 import contextlib
+import time
 from typing import (
     Dict,
     Any,
@@ -31,7 +32,10 @@ from typing import (
     TYPE_CHECKING,
     cast,
     TypeVar,
-    List
+    List,
+    Set,
+    FrozenSet,
+    Iterable
 )
 from datetime import datetime
 
@@ -44,19 +48,93 @@ if TYPE_CHECKING:
 from quant.impl import events
 from quant import entities
 from quant.utils.cache.cache_manager import CacheHandlers
+from quant.utils.cache.cacheable import CacheableType
 from quant.impl.events.event import Event, InternalEvent, DiscordEvent
 from quant.impl.events.types import EventTypes
 
 EventT: TypeVar = TypeVar("EventT", Event, DiscordEvent, InternalEvent)
 
+# Guilds with more channels and members than this are cached in slices of this size
+DEFAULT_GUILD_SLICE_SIZE = 1000
+
+_DISPATCH_OPCODE = 0
+
+CACHED_EVENTS = frozenset({
+    EventTypes.READY_EVENT,
+    EventTypes.MESSAGE_CREATE,
+    EventTypes.VOICE_STATE_UPDATE,
+    EventTypes.GUILD_CREATE,
+    EventTypes.GUILD_DELETE,
+    EventTypes.CHANNEL_CREATE
+})
+
+# Removed from the cache after listeners of the event, so they still see the removed entity
+EVICTED_EVENTS = {
+    EventTypes.MESSAGE_DELETE: CacheableType.MESSAGE,
+    EventTypes.CHANNEL_DELETE: CacheableType.CHANNEL
+}
+
+CacheHandlerT = Callable[..., None]
+
+
+@attrs.define(kw_only=True)
+class CacheHandlerStats:
+    calls: int = attrs.field(default=0)
+    total_time: float = attrs.field(default=0.0)
+    max_time: float = attrs.field(default=0.0)
+
+    @property
+    def average_time(self) -> float:
+        if self.calls == 0:
+            return float("nan")
+
+        return self.total_time / self.calls
+
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
 
 class EventFactory:
-    def __init__(self, cache_manager: CacheManager) -> None:
+    def __init__(self, cache_manager: CacheManager, guild_slice_size: int | None = DEFAULT_GUILD_SLICE_SIZE) -> None:
         self.added_listeners: Dict[EventT, List[Callable]] = {}
         self._listener_transformer: Dict[str, EventT] = {}
+        self._subscribed_events: Set[str] = set(CACHED_EVENTS)
+        self._raw_listened = False
+        self._raw_unfiltered = True
+        self._raw_all_dispatch = False
+        self._raw_opcodes: FrozenSet[int] = frozenset()
+        self._raw_event_names: FrozenSet[str] = frozenset()
+        self._listeners_changed: List[Callable[[], None]] = []
         self.cache = cache_manager
+        self.guild_slice_size = guild_slice_size
         self.entity_factory = entities.factory.EntityFactory(self.cache)
 
+        # Built once, cache_item is a dict lookup
+        self.cache_handlers = CacheHandlers(self.entity_factory, cacheable=self.cache.cacheable)
+        self._cache_pipeline: Dict[str, CacheHandlerT] = {
+            EventTypes.READY_EVENT: self.cache_handlers.handle_ready,
+            EventTypes.MESSAGE_CREATE: self.cache_handlers.handle_message,
+            EventTypes.VOICE_STATE_UPDATE: self.cache_handlers.handle_voice_state_update,
+            EventTypes.GUILD_CREATE: self.cache_handlers.handle_guild,
+            EventTypes.GUILD_DELETE: self.cache_handlers.handle_guild_delete,
+            EventTypes.CHANNEL_CREATE: self.cache_handlers.handle_channel_create
+        }
+        evictions = {
+            EventTypes.MESSAGE_DELETE: self.cache_handlers.handle_message_delete,
+            EventTypes.CHANNEL_DELETE: self.cache_handlers.handle_channel_delete
+        }
+        self._cache_evictions: Dict[str, CacheHandlerT] = {
+            event_name: handler
+            for event_name, handler in evictions.items()
+            if self.cache.cacheable & EVICTED_EVENTS[event_name]
+        }
+        self._subscribed_events.update(self._cache_evictions)
+        self.cache_stats: Dict[str, CacheHandlerStats] = {
+            event_name: CacheHandlerStats() for event_name in (*self._cache_pipeline, *self._cache_evictions)
+        }
+
     # TODO: а оно нужно вообще?
     def build_event(self, received_type: EventTypes, **details) -> EventT | None:
         event_type = received_type.value
@@ -83,25 +161,119 @@ class EventFactory:
 
             self.added_listeners[event] = callbacks
 
-        if not hasattr(event, "event_api_name"):
+        if event is events.RawDispatchEvent:
+            self._raw_listened = True
+            self._update_raw_filter()
+
+        if hasattr(event, "event_api_name"):
+            fields = attrs.fields(event)
+            self._listener_transformer[fields.event_api_name.default] = event
+            self._subscribed_events.add(fields.event_api_name.default)
+
+        for hook in self._listeners_changed:
+            hook()
+
+    def on_listeners_changed(self, hook: Callable[[], None]) -> None:
+        """Calls ``hook`` every time a listener is added"""
+        self._listeners_changed.append(hook)
+
+    def event_class(self, event_name: str) -> EventT | None:
+        """Listened event class of this dispatch event name"""
+        return self._listener_transformer.get(event_name)
+
+    @property
+    def listened_events(self) -> List[str]:
+        """Dispatch event names which have at least one listener"""
+        return list(self._listener_transformer)
+
+    @property
+    def raw_listened(self) -> bool:
+        return self._raw_listened
+
+    def set_raw_filter(self, opcodes: Iterable[int] | None = None, event_names: Iterable[str] | None = None) -> None:
+        """Limits :class:`RawDispatchEvent` to frames with one of ``opcodes``
+        or dispatch events named one of ``event_names``. Without both every frame is raw dispatched
+        """
+        self._raw_opcodes = frozenset(opcodes) if opcodes is not None else frozenset()
+        self._raw_event_names = frozenset(event_names) if event_names is not None else frozenset()
+        self._raw_unfiltered = opcodes is None and event_names is None
+        self._update_raw_filter()
+
+    def _update_raw_filter(self) -> None:
+        self._raw_all_dispatch = self._raw_listened and (
+            self._raw_unfiltered or _DISPATCH_OPCODE in self._raw_opcodes
+        )
+
+    @property
+    def raw_event_names(self) -> FrozenSet[str] | None:
+        """Dispatch event names raw listeners need, ``None`` means all of them"""
+        if self._raw_all_dispatch:
             return
 
-        fields = attrs.fields(event)
-        self._listener_transformer[fields.event_api_name.default] = event
+        return self._raw_event_names if self._raw_listened else frozenset()
+
+    def wants_raw(self, opcode: int, event_name: str | None) -> bool:
+        """Whether this frame has to be dispatched as :class:`RawDispatchEvent`"""
+        return self._raw_listened and (
+            self._raw_unfiltered or opcode in self._raw_opcodes or event_name in self._raw_event_names
+        )
+
+    def is_subscribed(self, event_name: str) -> bool:
+        """Whether dispatch event with this name is cached or listened by anyone"""
+        return (
+            self._raw_all_dispatch
+            or event_name in self._subscribed_events
+            or (self._raw_listened and event_name in self._raw_event_names)
+        )
+
+    def register_cache_handler(self, event_name: str, handler: CacheHandlerT) -> None:
+        """Updates cache with ``handler(**payload)`` on every ``event_name`` dispatch event.
+
+        Replaces the built-in handler of this event if there is one.
+        """
+        self._cache_pipeline[event_name] = handler
+        self._cache_evictions.pop(event_name, None)
+        self.cache_stats.setdefault(event_name, CacheHandlerStats())
+        self._subscribed_events.add(event_name)
 
     def cache_item(self, event_name: EventTypes, **kwargs) -> None:
-        cache_handler = CacheHandlers(self.entity_factory, cacheable=self.cache.cacheable)
-        handlers = {
-            EventTypes.READY_EVENT: cache_handler.handle_ready,
-            EventTypes.MESSAGE_CREATE: cache_handler.handle_message,
-            EventTypes.VOICE_STATE_UPDATE: cache_handler.handle_voice_state_update,
-            EventTypes.GUILD_CREATE: cache_handler.handle_guild,
-            EventTypes.GUILD_DELETE: cache_handler.handle_guild_delete,
-            EventTypes.CHANNEL_CREATE: cache_handler.handle_channel_create
-        }
+        handler = self._cache_pipeline.get(event_name)
+        if handler is None:
+            return
+
+        started = time.perf_counter()
+        handler(**kwargs)
+        self.cache_stats[event_name].add(time.perf_counter() - started)
+
+    def evict_item(self, event_name: EventTypes, **kwargs) -> None:
+        """Removes entity deleted by this event from the cache once the event is built.
+
+        With concurrent or partitioned dispatch listeners may run after the removal,
+        they get the removed entity from the event, not from the cache.
+        """
+        handler = self._cache_evictions.get(event_name)
+        if handler is None:
+            return
+
+        started = time.perf_counter()
+        handler(**kwargs)
+        self.cache_stats[event_name].add(time.perf_counter() - started)
 
-        if handler := handlers.get(event_name):
-            handler(**kwargs)
+    async def cache_guild(self, payload: Dict) -> entities.Guild | None:
+        """Caches GUILD_CREATE, large guilds are ingested incrementally. Returns cached guild"""
+        size = len(payload.get("channels", ())) + len(payload.get("members", ()))
+        # A handler registered by the user replaces incremental ingestion too
+        builtin = self._cache_pipeline[EventTypes.GUILD_CREATE] == self.cache_handlers.handle_guild
+
+        if not builtin or self.guild_slice_size is None or size <= self.guild_slice_size:
+            self.cache_item(EventTypes.GUILD_CREATE, **payload)
+        else:
+            # Timed as a whole, including the time spent yielding to the loop
+            started = time.perf_counter()
+            await self.cache_handlers.handle_guild_incremental(self.guild_slice_size, **payload)
+            self.cache_stats[EventTypes.GUILD_CREATE].add(time.perf_counter() - started)
+
+        return self.cache.get_guild(entities.Snowflake(payload["id"]))
 
     def deserialize_voice_state_update_event(
         self,
@@ -224,7 +396,11 @@ class EventFactory:
         )
 
     def deserialize_message_delete_event(self, payload: Dict) -> events.MessageDeleteEvent:
-        message = self.entity_factory.deserialize_message(payload)
+        # Payload has only the IDs, the cached message is the full one
+        message = self.cache.get_message(entities.Snowflake(payload.get("id")))
+        if message is None:
+            message = self.entity_factory.deserialize_message(payload)
+
         return events.MessageDeleteEvent(
             cache_manager=self.cache,
             author=message.author,
@@ -241,9 +417,18 @@ class EventFactory:
         )
 
     def deserialize_guild_create_event(self, payload: Dict) -> events.GuildCreateEvent:
+        # Guild is already cached (with members) when GUILD caching is enabled
+        guild = self.cache.get_guild(entities.Snowflake(payload["id"]))
         return events.GuildCreateEvent(
             cache_manager=self.cache,
-            guild=self.entity_factory.deserialize_guild(payload),
+            guild=guild if guild is not None else self.entity_factory.deserialize_guild(payload),
+            entity_factory=self.entity_factory
+        )
+
+    def deserialize_channel_create_event(self, payload: Dict) -> events.ChannelCreateEvent:
+        return events.ChannelCreateEvent(
+            cache_manager=self.cache,
+            channel=self.entity_factory.deserialize_channel(payload),
             entity_factory=self.entity_factory
         )
 
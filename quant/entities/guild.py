@@ -113,6 +113,7 @@ class Guild(BaseModel):
     soundboard_sounds: List[Any] = attrs.field()
     version: int = attrs.field()
     locale: str = attrs.field()
+    partial: bool = attrs.field(default=False)
 
     async def delete(self) -> None:
         await self.client.rest.delete_guild(self.id)
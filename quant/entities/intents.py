@@ -22,6 +22,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 import enum
+from typing import Dict, Final
 
 
 class Intents(enum.IntFlag):
@@ -68,3 +69,25 @@ class Intents(enum.IntFlag):
     ALL_PRIVILEGED = ALL_GUILDS_PRIVILEGED | MESSAGE_CONTENT
 
     ALL = ALL_UNPRIVILEGED | ALL_PRIVILEGED
+
+    # Never sent to Discord: Client replaces it with the smallest intent set
+    # its listeners, cache and commands need. Can be combined with explicit intents.
+    AUTO = 1 << 62
+
+
+EVENT_INTENTS: Final[Dict[str, Intents]] = {
+    "GUILD_CREATE": Intents.GUILDS,
+    "GUILD_DELETE": Intents.GUILDS,
+    "CHANNEL_CREATE": Intents.GUILDS,
+    "GUILD_MEMBER_ADD": Intents.GUILD_MEMBERS,
+    "GUILD_MEMBER_REMOVE": Intents.GUILD_MEMBERS,
+    "GUILD_MEMBERS_CHUNK": Intents.GUILD_MEMBERS,
+    "MESSAGE_CREATE": Intents.ALL_MESSAGES,
+    "MESSAGE_UPDATE": Intents.ALL_MESSAGES,
+    "MESSAGE_DELETE": Intents.ALL_MESSAGES,
+    "MESSAGE_REACTION_ADD": Intents.ALL_MESSAGE_REACTIONS,
+    "MESSAGE_REACTION_REMOVE": Intents.ALL_MESSAGE_REACTIONS,
+    "TYPING_START": Intents.ALL_MESSAGE_TYPING,
+    "VOICE_STATE_UPDATE": Intents.GUILD_VOICE_STATES,
+    "PRESENCE_UPDATE": Intents.GUILD_PRESENCES
+}
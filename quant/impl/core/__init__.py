@@ -28,6 +28,10 @@ from .rest import RESTImpl
 from .gateway import Gateway
 from .http_bot import HTTPBot
 from .exceptions import NotEnoughPermissions
+from .session_store import SessionStore, FileSessionStore, SessionState
+from .cluster import ClusterManager, ClusterClient
+from .supervisor import ShardSupervisor, ShardState, ShardHealth
+from .recorder import FrameRecorder, GatewayReplay, ReplayStats
 
 __all__ = (
     "InteractionContext",
@@ -40,5 +44,16 @@ __all__ = (
     "RESTImpl",
     "Gateway",
     "HTTPBot",
-    "NotEnoughPermissions"
+    "NotEnoughPermissions",
+    "SessionStore",
+    "FileSessionStore",
+    "SessionState",
+    "ClusterManager",
+    "ClusterClient",
+    "ShardSupervisor",
+    "ShardState",
+    "ShardHealth",
+    "FrameRecorder",
+    "GatewayReplay",
+    "ReplayStats"
 )
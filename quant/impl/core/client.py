@@ -26,6 +26,8 @@ from __future__ import annotations as _
 import asyncio
 import base64
 import inspect
+import math
+import signal
 from typing import (
     Coroutine,
     Callable,
@@ -42,21 +44,22 @@ from typing import (
 if TYPE_CHECKING:
     from quant.impl.core.commands import ApplicationCommandObject
     from quant.entities.button import Button
+    from quant.entities.member import GuildMember
     from quant.impl.events.event import EventTypes
 
 import quant.utils.asyncio_utils as asyncio_utils
 from quant.entities.factory import EventFactory
+from quant.entities.factory.event_factory import DEFAULT_GUILD_SLICE_SIZE
 from quant.entities.factory.event_controller import EventController
 from quant.utils.cache.cache_manager import CacheManager
 from quant.utils import logger
 from quant.entities.interactions.slash_option import ApplicationCommandOption
-from quant.entities.gateway import GatewayInfo
+from quant.entities.gateway import GatewayInfo, SessionStartLimitObject
 from quant.entities.interactions.component_types import ComponentType
 from quant.impl.core.shard import Shard
 from quant.entities.interactions.interaction import Interaction
 from quant.entities.snowflake import Snowflake
 from quant.entities.user import User
-from quant.impl.events.bot.exception_event import QuantExceptionEvent
 from quant.impl.events.bot.ready_event import ReadyEvent
 from quant.entities.interactions.interaction import InteractionType
 from quant.entities.modal.modal import Modal
@@ -64,14 +67,22 @@ from quant.impl.core.commands import SlashCommand, SlashSubCommand, SlashSubGrou
 from quant.entities.interactions.slash_option import SlashOptionType
 from quant.impl.core.context import InteractionContext, ModalContext, ButtonContext
 from quant.impl.events.bot.interaction_create_event import InteractionCreateEvent
-from quant.impl.core.gateway import Gateway
-from quant.entities.intents import Intents
+from quant.impl.core.gateway import Gateway, RESUMABLE_CLOSE_CODE, DEFAULT_OFFLOAD_THRESHOLD
+from quant.impl.core.session_store import SessionStore
+from quant.impl.core.identify_scheduler import IdentifyScheduler
+from quant.impl.core.cluster import ClusterClient, ClusterIdentifyScheduler, shard_id_for_guild
+from quant.impl.core.heartbeat import Latency
+from quant.impl.core.supervisor import ShardSupervisor, ShardHealth
+from quant.impl.core.dispatch_queue import DEFAULT_DISPATCH_QUEUE_SIZE, OVERFLOW_BLOCK
+from quant.impl.core.member_chunker import MemberChunker, MemberChunkRequest
+from quant.entities.intents import Intents, EVENT_INTENTS
 from quant.impl.core.exceptions.library_exception import DiscordException
 from quant.impl.core.rest import RESTImpl
 from quant.impl.events.event import Event, InternalEvent, DiscordEvent
 from quant.entities.model import BaseModel
 from quant.entities.activity import ActivityData
 from quant.utils.cache.cacheable import CacheableType
+from quant.utils.json_codec import JSONCodec, get_codec
 
 CoroutineT = TypeVar("CoroutineT", bound=Callable[..., Coroutine[Any, Any, Any]])
 
@@ -84,9 +95,58 @@ class Client:
     token: :class:`str`
         The authentication token required for the bot to connect to Discord.
     intents: :class:`Intents`
-        The intents to be used by the bot
+        The intents to be used by the bot.
+        ``Intents.AUTO`` computes the smallest set from registered listeners,
+        enabled cacheable types and slash commands when the bot starts
     mobile: :class:`bool`
         Specifies whether the bot is running in a mobile environment
+    json_codec: :class:`JSONCodec | str | None`
+        JSON backend used for gateway and REST payloads.
+        Either a :class:`JSONCodec` instance or one of ``"json"``, ``"orjson"``, ``"ujson"``, ``"auto"``
+    encoding: :class:`str`
+        Gateway payload encoding, ``"json"`` or ``"etf"`` (Erlang Term Format).
+        ETF is decoded in pure python, 4-7x slower than JSON and not smaller, it's not a performance option
+    compression: :class:`str`
+        Gateway transport compression, ``"zlib-stream"`` or ``"zstd-stream"`` (requires ``zstandard``)
+    compression_stats: :class:`bool`
+        Time and count every inflated frame, see :attr:`Shard.compression_stats`
+    session_store: :class:`SessionStore | None`
+        Where shard sessions are saved on shutdown, so the next start resumes them
+        instead of identifying. See :class:`FileSessionStore`.
+        A resumed session receives no READY and GUILD_CREATE events, so the cache starts cold
+        and fills only from events received after resuming; ``me`` is fetched with REST
+    dispatch_queue_size: :class:`int`
+        How many received events each shard buffers while listeners are busy
+    dispatch_overflow: :class:`str`
+        What a shard does when its dispatch queue is full: ``"block"`` reading,
+        ``"drop_oldest"`` queued event or ``"spill"`` over the size with a warning
+    max_concurrent_reconnects: :class:`int | None`
+        How many shards may reconnect at the same time,
+        ``None`` uses ``max_concurrency`` from the gateway session start limit
+    offload_threshold: :class:`int | None`
+        Gateway frames of at least this many bytes are inflated and parsed in a worker thread
+        instead of the event loop, ``None`` disables it
+    guild_slice_size: :class:`int | None`
+        Guilds with more channels and members than this are cached this many at a time,
+        yielding to the event loop in between. ``None`` always caches guilds in one pass
+    record_directory: :class:`str | None`
+        Directory where every shard records raw gateway frames for :class:`GatewayReplay`
+    gateway_url: :class:`str | None`
+        Connect shards to this websocket URL instead of Discord, e.g. :class:`quant.testing.FakeGateway`.
+        ``GET /gateway/bot`` is not requested then
+    gateway_max_concurrency: :class:`int | None`
+        Identify ``max_concurrency`` used with ``gateway_url``,
+        ``None`` lets every shard identify at once
+    concurrent_listeners: :class:`bool`
+        Run every event listener as its own task, so slow listeners don't delay the others
+    listener_timeout: :class:`float | None`
+        Seconds a listener may run before it's cancelled and reported as :class:`QuantExceptionEvent`
+    listener_concurrency: :class:`int | None`
+        Max concurrently running listeners per event type when ``concurrent_listeners`` is enabled
+    partitioned_dispatch: :class:`bool`
+        Dispatch events of different guilds (channels for DMs) in parallel, keeping the order within each guild.
+        Queued events per partition are available from ``event_controller.partition_depths``,
+        a guild with 1000 queued events makes the dispatch queue wait for it
 
     Attributes
     ----------
@@ -118,6 +178,8 @@ class Client:
         Enable asyncio debug or no
     sync_commands: :class:`bool`
         Sync application commands or no. If False, syncing will be disabled
+    codec: :class:`JSONCodec`
+        The JSON codec used for encoding and decoding payloads.
     """
     T = TypeVar("T")
 
@@ -128,23 +190,73 @@ class Client:
         mobile: bool = False,
         asyncio_debug: bool = False,
         sync_commands: bool = True,
-        cacheable: CacheableType = CacheableType.ALL
+        cacheable: CacheableType = CacheableType.ALL,
+        json_codec: JSONCodec | str | None = None,
+        encoding: str = "json",
+        compression: str = "zlib-stream",
+        compression_stats: bool = False,
+        session_store: SessionStore | None = None,
+        dispatch_queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        dispatch_overflow: str = OVERFLOW_BLOCK,
+        max_concurrent_reconnects: int | None = None,
+        offload_threshold: int | None = DEFAULT_OFFLOAD_THRESHOLD,
+        guild_slice_size: int | None = DEFAULT_GUILD_SLICE_SIZE,
+        record_directory: str | None = None,
+        gateway_url: str | None = None,
+        gateway_max_concurrency: int | None = None,
+        concurrent_listeners: bool = False,
+        listener_timeout: float | None = None,
+        listener_concurrency: int | None = None,
+        partitioned_dispatch: bool = False
     ) -> None:
         self._me: User | None = None
         self.shards: List[Shard] = []
         self.token = token
         self.intents = intents
         self.loop = asyncio_utils.get_loop()
+        self.codec = get_codec(json_codec)
         self.cache = CacheManager(cacheable=cacheable)
-        self.event_factory = EventFactory(self.cache)
-        self.event_controller = EventController(self.event_factory)
-        self.rest = RESTImpl(token, cache=self.cache)
+        self.event_factory = EventFactory(self.cache, guild_slice_size=guild_slice_size)
+        self.event_controller = EventController(
+            self.event_factory,
+            concurrent=concurrent_listeners,
+            listener_timeout=listener_timeout,
+            max_concurrency=listener_concurrency,
+            partitioned=partitioned_dispatch
+        )
+        self.rest = RESTImpl(token, cache=self.cache, codec=self.codec)
         self.client_id: int = self._decode_token_to_id()
         self.gateway: Gateway | None = None
+        self.identify_scheduler: IdentifyScheduler | None = None
+        self.cluster: ClusterClient | None = None
+        self.member_chunker = MemberChunker(self)
+        self.supervisor = ShardSupervisor(max_concurrent_reconnects=max_concurrent_reconnects)
         self.mobile = mobile
+        self.encoding = encoding
+        self.compression = compression
+        self.compression_stats = compression_stats
+        self.session_store = session_store
+        self.dispatch_queue_size = dispatch_queue_size
+        self.dispatch_overflow = dispatch_overflow
+        self.offload_threshold = offload_threshold
+        self.record_directory = record_directory
+        self.gateway_url = gateway_url
+        self.gateway_max_concurrency = gateway_max_concurrency
         self.asyncio_debug = asyncio_debug
         self.sync_commands = sync_commands
-        self._gateway_info: GatewayInfo = self.loop.run_until_complete(self.rest.get_gateway())
+        if gateway_url is not None:
+            self._gateway_info = GatewayInfo(
+                url=gateway_url,
+                shards=1,
+                session_start_limit=SessionStartLimitObject(
+                    total=1000,
+                    remaining=1000,
+                    reset_after=0,
+                    max_concurrency=gateway_max_concurrency or 1
+                )
+            )
+        else:
+            self._gateway_info: GatewayInfo = self.loop.run_until_complete(self.rest.get_gateway())
 
         self._modals: Dict[str, Modal] = {}
         self._buttons: Dict[str, Button] = {}
@@ -174,6 +286,30 @@ class Client:
     def gateway_info(self) -> GatewayInfo:
         return self._gateway_info
 
+    @property
+    def latency(self) -> float:
+        """Average of the last heartbeat round trip of all shards in seconds"""
+        latencies = [shard.latency for shard in self.shards if not math.isnan(shard.latency)]
+        if not latencies:
+            return float("nan")
+
+        return sum(latencies) / len(latencies)
+
+    @property
+    def ready_times(self) -> Dict[int, float | None]:
+        """Seconds it took every shard to become ready"""
+        return {shard.shard_id: shard.ready_time for shard in self.shards}
+
+    @property
+    def latencies(self) -> Dict[int, Latency]:
+        """Heartbeat latency statistics per shard ID"""
+        return {shard.shard_id: shard.latency_stats for shard in self.shards}
+
+    @property
+    def shard_health(self) -> Dict[int, ShardHealth]:
+        """Lifecycle state, reconnects and last error per shard ID"""
+        return {shard.shard_id: self.supervisor.get_health(shard.shard_id) for shard in self.shards}
+
     @property
     def me(self) -> User:
         return self._me
@@ -182,6 +318,44 @@ class Client:
     def me(self, value: User) -> None:
         self._me = value
 
+    def _resolve_intents(self) -> Intents:
+        if not self.intents & Intents.AUTO:
+            return self.intents
+
+        intents = self.intents & ~Intents.AUTO
+
+        raw_event_names = self.event_factory.raw_event_names
+        if raw_event_names is None:
+            logger.warning("Unfiltered raw event listener registered, can't derive intents. Using ALL_UNPRIVILEGED")
+            return intents | Intents.ALL_UNPRIVILEGED
+
+        required: Dict[str, Intents] = {}
+
+        for event_name in self.event_factory.listened_events:
+            if (event_intents := EVENT_INTENTS.get(event_name)) is not None:
+                required[f"{event_name} listener"] = event_intents
+
+        for event_name in raw_event_names:
+            if (event_intents := EVENT_INTENTS.get(event_name)) is not None:
+                required[f"{event_name} raw listener"] = event_intents
+
+        cacheable = self.cache.cacheable
+        if cacheable & (CacheableType.GUILD | CacheableType.ROLE | CacheableType.CHANNEL | CacheableType.EMOJI):
+            required["guild cache"] = Intents.GUILDS
+
+        if cacheable & CacheableType.MESSAGE:
+            required["message cache"] = Intents.ALL_MESSAGES
+
+        if self.slash_commands:
+            required["slash commands"] = Intents.GUILDS
+
+        for reason, event_intents in required.items():
+            logger.info("%s requires %s", reason, Intents(event_intents).name)
+            intents |= event_intents
+
+        logger.info("Resolved intents: %s (%s)", Intents(intents).name, intents.value)
+        return intents
+
     def _decode_token_to_id(self) -> int:
         first_token_part = self.token.split('.')[0]
         token = first_token_part[4:] \
@@ -190,7 +364,7 @@ class Client:
         decoded_token = base64.b64decode(token + "==")
         return int(decoded_token.decode("utf8"))
 
-    async def _run_one_shard(self, shard_count: int, shard_id: int, loop: asyncio.AbstractEventLoop) -> Shard:
+    async def _run_one_shard(self, shard: Shard, loop: asyncio.AbstractEventLoop) -> Shard:
         BaseModel.set_client(self)
 
         if loop is not None:
@@ -199,7 +373,6 @@ class Client:
         if self.asyncio_debug:
             self.loop.set_debug(self.asyncio_debug)
 
-        shard = Shard(num_shards=shard_count, shard_id=shard_id, intents=self.intents, mobile=self.mobile)
         await shard.start(client=self, loop=self.loop)
 
         return shard
@@ -211,7 +384,12 @@ class Client:
         """
         self.run_with_shards(shard_count=1, loop=loop)
 
-    def run_with_shards(self, shard_count: int, loop: asyncio.AbstractEventLoop = None) -> None:
+    def run_with_shards(
+        self,
+        shard_count: int,
+        loop: asyncio.AbstractEventLoop = None,
+        shard_ids: List[int] | None = None
+    ) -> None:
         """Run bot with custom shard_count.
 
         Parameters
@@ -220,29 +398,49 @@ class Client:
             Shard count with you want start bot
         loop: :class:`asyncio.AbstractEventLoop`
             Your loop if needed
+        shard_ids: :class:`List[int] | None`
+            Run only these shards of ``shard_count`` (used by :class:`ClusterManager`)
         """
-        for shard_id in range(shard_count):
+        self.intents = self._resolve_intents()
+
+        if self.gateway_url is not None and self.gateway_max_concurrency is None:
+            # No identify rate limit to respect, don't space shards 5 seconds apart
+            self._gateway_info.session_start_limit.max_concurrency = shard_count
+
+        session_states = self.session_store.load(shard_count) if self.session_store is not None else {}
+        if session_states:
+            logger.info("Restored %s session(s), shards will try to resume", len(session_states))
+
+        for shard_id in (shard_ids if shard_ids is not None else range(shard_count)):
             self.shards.append(Shard(
                 num_shards=shard_count,
                 shard_id=shard_id,
                 intents=self.intents,
-                mobile=self.mobile
+                mobile=self.mobile,
+                encoding=self.encoding,
+                compression=self.compression,
+                compression_stats=self.compression_stats,
+                session_state=session_states.get(shard_id),
+                dispatch_queue_size=self.dispatch_queue_size,
+                dispatch_overflow=self.dispatch_overflow,
+                offload_threshold=self.offload_threshold,
+                record_directory=self.record_directory,
+                gateway_url=self.gateway_url
             ))
 
-        max_concurrency = self._gateway_info.session_start_limit.max_concurrency
-        for i in range(0, len(self.shards), max_concurrency):
-            queue_shards = self.shards[i:i + max_concurrency]
-
-            for queued_shard in queue_shards:
-                shard = self.loop.run_until_complete(self._run_one_shard(
-                    shard_count=shard_count,
-                    shard_id=queued_shard.shard_id,
-                    loop=loop
-                ))
+        # All shards connect at once, the scheduler spaces their IDENTIFY calls
+        # by max_concurrency buckets and session start limit
+        session_start_limit = self._gateway_info.session_start_limit
+        if self.cluster is not None:
+            self.identify_scheduler = ClusterIdentifyScheduler(self.cluster, session_start_limit)
+        else:
+            self.identify_scheduler = IdentifyScheduler(session_start_limit)
 
-                self.shards[queued_shard.shard_id] = shard
+        if self.supervisor.max_concurrent_reconnects is None:
+            self.supervisor.max_concurrent_reconnects = max(session_start_limit.max_concurrency, 1)
 
-            asyncio.ensure_future(asyncio.sleep(5), loop=self.loop)
+        for shard in self.shards:
+            self.loop.run_until_complete(self._run_one_shard(shard=shard, loop=loop))
 
         self._run_forever()
 
@@ -257,23 +455,54 @@ class Client:
         self.run_with_shards(shard_count=self._gateway_info.shards, loop=loop)
 
     def _run_forever(self) -> None:
+        # Rolling deploys stop the process with SIGTERM, it has to save sessions like Ctrl+C does
+        try:
+            self.loop.add_signal_handler(signal.SIGTERM, self.loop.stop)
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops and loops outside the main thread have no signal handlers
+            pass
+
         try:
             self.loop.run_forever()
+            self._shutdown()
         except KeyboardInterrupt:
-            logger.info("Shutting down bot")
-            tasks = asyncio.all_tasks(loop=self.loop)
+            self._shutdown()
+        finally:
+            logger.info("Fully terminated")
 
-            for task in tasks:
-                task.cancel()
+    def _shutdown(self) -> None:
+        logger.info("Shutting down bot")
+        tasks = asyncio.all_tasks(loop=self.loop)
 
-            for shard in self.shards:
-                self.loop.run_until_complete(shard.gateway.close())
+        for task in tasks:
+            task.cancel()
 
-            asyncio.gather(*tasks)
-            asyncio_utils.kill_loop()
-            logger.info("Goodbye.")
-        finally:
-            logger.info("Fully terminated")
+        self.supervisor.stop()
+        self._save_sessions()
+
+        for shard in self.shards:
+            # Closing with 1000 would invalidate the session we just saved
+            close_code = RESUMABLE_CLOSE_CODE if self.session_store is not None else 1000
+            self.loop.run_until_complete(shard.gateway.close(code=close_code))
+
+        asyncio.gather(*tasks)
+        asyncio_utils.kill_loop()
+        logger.info("Goodbye.")
+
+    def _save_sessions(self) -> None:
+        if self.session_store is None:
+            return
+
+        states = [
+            state for shard in self.shards
+            if shard.gateway is not None and (state := shard.gateway.session_state()) is not None
+        ]
+
+        try:
+            self.session_store.save(states)
+            logger.info("Saved %s session(s)", len(states))
+        except OSError as exception:
+            logger.error("Can't save sessions: %s", exception)
 
     @overload
     def add_listener(self, event: T, coro: CoroutineT) -> None:
@@ -311,6 +540,35 @@ class Client:
             event, coro = args
             self._add_listener_from_event_and_coro(event, coro)
 
+    def filter_raw_events(self, opcodes: List[int] | None = None, event_names: List[str] | None = None) -> None:
+        """Limits :class:`RawDispatchEvent` to the given opcodes or dispatch event names
+
+        Unfiltered raw listeners receive every frame, including heartbeat ACKs,
+        and keep every dispatch event from being skipped before parsing.
+
+        Parameters
+        ==========
+        opcodes: :class:`List[int] | None`
+            Gateway opcodes to raw dispatch, e.g. ``[OpCode.HEARTBEAT_ACK]``
+        event_names: :class:`List[str] | None`
+            Dispatch event names to raw dispatch, e.g. ``["PRESENCE_UPDATE"]``
+        """
+        self.event_factory.set_raw_filter(opcodes=opcodes, event_names=event_names)
+
+    def add_cache_handler(self, event_name: str, handler: Callable[..., None]) -> None:
+        """Updates cache with ``handler(**payload)`` on every ``event_name`` dispatch event
+
+        Handlers run before listeners of the event, their timings are in ``event_factory.cache_stats``.
+
+        Parameters
+        ==========
+        event_name: :class:`str`
+            Dispatch event name, e.g. ``"GUILD_ROLE_CREATE"``
+        handler: :class:`Callable[..., None]`
+            Synchronous function receiving the event payload as keyword arguments
+        """
+        self.event_factory.register_cache_handler(event_name, handler)
+
     def _add_listener_from_event_and_coro(self, event: T, coro: CoroutineT) -> None:
         if inspect.iscoroutine(coro):
             raise DiscordException("Callback function must be coroutine")
@@ -526,12 +784,7 @@ class Client:
             if handler is not None:
                 await handler(interaction)
         except Exception as e:
-            await self.event_controller.dispatch(
-                self.event_factory.build_from_class(
-                    QuantExceptionEvent(), InteractionContext(self, interaction), e
-                )
-            )
-            raise e
+            await self.event_controller.report_exception(e, InteractionContext(self, interaction))
 
     async def set_activity(self, activity: ActivityData):
         """|coro|
@@ -556,6 +809,114 @@ class Client:
 
             await shard.gateway.send_presence(**presence)
 
+    def shard_for(self, guild_id: Snowflake | int) -> Shard | None:
+        """Returns the shard which receives events of this guild
+
+        ``None`` means the shard runs in another cluster.
+        """
+        if not self.shards:
+            raise DiscordException("Bot is not running")
+
+        shard_id = shard_id_for_guild(guild_id, self.shards[0].num_shards)
+
+        for shard in self.shards:
+            if shard.shard_id == shard_id:
+                return shard
+
+    def _guild_gateway(self, guild_id: Snowflake | int) -> Gateway | None:
+        shard = self.shard_for(guild_id)
+        if shard is None:
+            if self.cluster is None:
+                raise DiscordException(f"No shard for guild {guild_id}")
+
+            # Owned by another cluster, callers go through IPC
+            return
+
+        if shard.gateway is None:
+            raise DiscordException(f"Shard {shard.shard_id} is not connected")
+
+        return shard.gateway
+
+    async def voice_connect(
+        self,
+        guild_id: Snowflake | int,
+        channel_id: Snowflake | int | None,
+        self_mute: bool = False,
+        self_deaf: bool = False
+    ) -> None:
+        """|coro|
+
+        Joins (or leaves with ``channel_id=None``) voice channel through the shard owning the guild
+        """
+        gateway = self._guild_gateway(guild_id)
+        if gateway is None:
+            await self.cluster.request("voice_connect", guild_id, channel_id, self_mute, self_deaf, guild_id=guild_id)
+            return
+
+        await gateway.voice_connect(guild_id, channel_id, self_mute=self_mute, self_deaf=self_deaf)
+
+    async def request_guild_members(self, guild_id: Snowflake | int, **kwargs) -> None:
+        """|coro|
+
+        Sends REQUEST_GUILD_MEMBERS through the shard owning the guild.
+        Keyword arguments are the same as :meth:`Gateway.request_guild_members`
+        """
+        gateway = self._guild_gateway(guild_id)
+        if gateway is None:
+            await self.cluster.request("request_guild_members", guild_id, guild_id=guild_id, **kwargs)
+            return
+
+        await gateway.request_guild_members(guild_id, **kwargs)
+
+    def fetch_members(
+        self,
+        guild_id: Snowflake | int,
+        query: str | None = None,
+        limit: int = 0,
+        presences: bool = False,
+        user_ids: List[Snowflake | int] | None = None,
+        timeout: float = 30
+    ) -> MemberChunkRequest:
+        """Requests guild members through the gateway
+
+        Result can be awaited to get every member or iterated with ``async for`` to get them chunk by chunk.
+        Received members are also merged into the cached guild.
+
+        Parameters
+        ==========
+        guild_id: :class:`Snowflake | int`
+            Guild to chunk, must be owned by a shard of this process
+        query: :class:`str | None`
+            Username prefix, empty string (default) means all members
+        limit: :class:`int`
+            Max members to receive, ``0`` means no limit
+        presences: :class:`bool`
+            Include presences of members
+        user_ids: :class:`List[Snowflake | int] | None`
+            Specific users to fetch instead of query
+        timeout: :class:`float`
+            Seconds to wait for the next chunk
+        """
+        return self.member_chunker.request(
+            guild_id,
+            query=query,
+            limit=limit,
+            presences=presences,
+            user_ids=user_ids,
+            timeout=timeout
+        )
+
+    async def chunk_guilds(
+        self,
+        guild_ids: List[Snowflake | int] | None = None,
+        concurrency: int = 5
+    ) -> Dict[Snowflake, List[GuildMember]]:
+        """|coro|
+
+        Fetches all members of given (or all cached) guilds with at most ``concurrency`` requests in flight
+        """
+        return await self.member_chunker.chunk_guilds(guild_ids, concurrency=concurrency)
+
     def get_component(self, custom_id: str) -> Modal | Button:
         if (modal := self.modals.get(custom_id)) is not None:
             return modal
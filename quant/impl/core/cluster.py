@@ -0,0 +1,578 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import math
+import multiprocessing
+import threading
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, List, TYPE_CHECKING
+
+import attrs
+
+if TYPE_CHECKING:
+    from quant.impl.core.client import Client
+
+from quant.impl.core.exceptions.library_exception import DiscordException
+from quant.impl.core.identify_scheduler import IdentifyScheduler, IDENTIFY_INTERVAL
+from quant.impl.core.session_store import FileSessionStore
+from quant.utils import logger
+
+MANAGER_ID = -1
+
+_REQUEST = "request"
+_RESPONSE = "response"
+
+ClientFactoryT = Callable[[], "Client"]
+
+
+class ClusterException(DiscordException):
+    ...
+
+
+def shard_id_for_guild(guild_id: int, shard_count: int) -> int:
+    return (int(guild_id) >> 22) % shard_count
+
+
+def split_shards(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Splits shard IDs into contiguous ranges, one per cluster"""
+    per_cluster = math.ceil(shard_count / cluster_count)
+    return [
+        list(range(start, min(start + per_cluster, shard_count)))
+        for start in range(0, shard_count, per_cluster)
+    ]
+
+
+@attrs.define(kw_only=True)
+class ClusterInfo:
+    cluster_id: int = attrs.field()
+    shard_ids: List[int] = attrs.field()
+    process: multiprocessing.Process | None = attrs.field(default=None)
+    connection: Connection | None = attrs.field(default=None)
+    restarts: int = attrs.field(default=0)
+    restart_at: float | None = attrs.field(default=None)
+    metrics: Dict[str, Any] = attrs.field(factory=dict)
+
+
+class ClusterIdentifyScheduler(IdentifyScheduler):
+    """Asks cluster manager for identify slots, so buckets are shared by all processes"""
+
+    def __init__(self, cluster: ClusterClient, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cluster = cluster
+
+    async def acquire(self, shard_id: int) -> None:
+        delay = await self.cluster.request(
+            "identify",
+            shard_id,
+            self.max_concurrency,
+            self.total,
+            self.remaining,
+            max(self._reset_at - time.monotonic(), 0),
+            cluster_id=MANAGER_ID
+        )
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ClusterClient:
+    """Worker side of a cluster: IPC channel to the manager and other clusters.
+
+    Handlers registered with :meth:`register` can be called from other clusters
+    with :meth:`request`. Builtin handlers: ``get_guild``, ``get_user``,
+    ``get_channel``, ``voice_connect``, ``request_guild_members``, ``metrics``.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        cluster_id: int,
+        shard_ids: List[int],
+        shard_count: int,
+        connection: Connection
+    ) -> None:
+        self.client = client
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.connection = connection
+
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._reader: threading.Thread | None = None
+
+        self.register("get_guild", lambda guild_id: client.cache.get_guild(guild_id))
+        self.register("get_user", lambda user_id: client.cache.get_user(user_id))
+        self.register("get_channel", lambda channel_id: client.cache.get_channel(channel_id))
+        self.register("voice_connect", self._voice_connect)
+        self.register("request_guild_members", self._request_guild_members)
+        self.register("metrics", self.metrics)
+
+    def register(self, name: str, handler: Callable[..., Any]) -> None:
+        self._handlers[name] = handler
+
+    def start(self) -> None:
+        self._reader = threading.Thread(target=self._read, name=f"quant-cluster-{self.cluster_id}", daemon=True)
+        self._reader.start()
+
+    async def request(
+        self,
+        method: str,
+        *args: Any,
+        cluster_id: int | None = None,
+        guild_id: int | None = None,
+        timeout: float = 10,
+        **kwargs: Any
+    ) -> Any:
+        """Calls ``method`` handler on another cluster.
+
+        Target is ``cluster_id`` or, if omitted, the cluster owning ``guild_id``.
+        """
+        if cluster_id is None and guild_id is None:
+            raise ClusterException("cluster_id or guild_id required")
+
+        request_id = next(self._request_ids)
+        future = self.client.loop.create_future()
+        self._pending[request_id] = future
+
+        self._send({
+            "type": _REQUEST,
+            "id": request_id,
+            "source": self.cluster_id,
+            "target": cluster_id,
+            "guild_id": guild_id,
+            "method": method,
+            "args": args,
+            "kwargs": kwargs
+        })
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        shards = {}
+
+        for shard in self.client.shards:
+            latency = shard.latency_stats
+            resume_stats = shard.resume_stats
+            shards[shard.shard_id] = {
+                "latency": latency.last,
+                "latency_p50": latency.p50,
+                "latency_p99": latency.p99,
+                "ready_time": shard.ready_time,
+                "resume_success_rate": resume_stats.success_rate if resume_stats is not None else float("nan")
+            }
+
+        return {
+            "cluster_id": self.cluster_id,
+            "guilds": len(self.client.cache.get_guilds()),
+            "shards": shards
+        }
+
+    def _gateway_for(self, guild_id: int):
+        shard = self.client.shard_for(guild_id)
+        if shard is None or shard.gateway is None:
+            raise ClusterException(f"Guild {guild_id} shard is not running in cluster {self.cluster_id}")
+
+        return shard.gateway
+
+    async def _voice_connect(self, guild_id: int, *args, **kwargs) -> None:
+        await self._gateway_for(guild_id).voice_connect(guild_id, *args, **kwargs)
+
+    async def _request_guild_members(self, guild_id: int, *args, **kwargs) -> None:
+        await self._gateway_for(guild_id).request_guild_members(guild_id, *args, **kwargs)
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        with self._send_lock:
+            self.connection.send(message)
+
+    def _read(self) -> None:
+        while True:
+            try:
+                message = self.connection.recv()
+            except (EOFError, OSError):
+                logger.error("Cluster %s lost connection to manager", self.cluster_id)
+                return
+
+            self.client.loop.call_soon_threadsafe(self._on_message, message)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message["type"] == _RESPONSE:
+            future = self._pending.get(message["id"])
+            if future is None or future.done():
+                return
+
+            if message["ok"]:
+                future.set_result(message["result"])
+            else:
+                future.set_exception(ClusterException(message["error"]))
+
+            return
+
+        self.client.loop.create_task(self._handle_request(message))
+
+    async def _handle_request(self, message: Dict[str, Any]) -> None:
+        response = {"type": _RESPONSE, "id": message["id"], "target": message["source"], "ok": True, "result": None}
+
+        try:
+            handler = self._handlers.get(message["method"])
+            if handler is None:
+                raise ClusterException(f"Unknown cluster method: {message['method']}")
+
+            result = handler(*message["args"], **message["kwargs"])
+            if inspect.isawaitable(result):
+                result = await result
+
+            response["result"] = result
+        except Exception as exception:
+            response.update({"ok": False, "error": f"{type(exception).__name__}: {exception}"})
+
+        try:
+            self._send(response)
+        except Exception as exception:
+            # Mostly unpicklable results
+            self._send({**response, "ok": False, "result": None, "error": f"{type(exception).__name__}: {exception}"})
+
+
+def _run_cluster(
+    client_factory: ClientFactoryT,
+    cluster_id: int,
+    shard_ids: List[int],
+    shard_count: int,
+    connection: Connection
+) -> None:
+    client = client_factory()
+
+    if isinstance(client.session_store, FileSessionStore):
+        # One file for every cluster would keep only the sessions of the last one saving
+        client.session_store = client.session_store.scoped(f"shards-{shard_ids[0]}-{shard_ids[-1]}")
+
+    client.cluster = ClusterClient(
+        client=client,
+        cluster_id=cluster_id,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        connection=connection
+    )
+    client.cluster.start()
+
+    logger.info("Cluster %s starting shards %s-%s", cluster_id, shard_ids[0], shard_ids[-1])
+    client.run_with_shards(shard_count=shard_count, shard_ids=shard_ids)
+
+
+class ClusterManager:
+    """Runs shards in several worker processes and supervises them.
+
+    Parameters
+    ==========
+    client_factory: :class:`Callable[[], Client]`
+        Module level function creating a configured :class:`Client` (listeners, commands).
+        It's called once in every worker process
+    shard_count: :class:`int`
+        Total shard count
+    cluster_count: :class:`int | None`
+        Worker process count, CPU count by default
+    metrics_interval: :class:`float`
+        How often cluster metrics are collected, in seconds
+
+    Examples
+    --------
+    .. highlight:: python
+
+        def create_client() -> Client:
+            client = Client(token=TOKEN)
+            client.add_listener(on_message)
+            return client
+
+        if __name__ == "__main__":
+            ClusterManager(create_client, shard_count=64, cluster_count=4).run()
+    """
+
+    def __init__(
+        self,
+        client_factory: ClientFactoryT,
+        shard_count: int,
+        cluster_count: int | None = None,
+        metrics_interval: float = 30,
+        max_restart_delay: float = 60
+    ) -> None:
+        self.client_factory = client_factory
+        self.shard_count = shard_count
+        self.metrics_interval = metrics_interval
+        self.max_restart_delay = max_restart_delay
+
+        cluster_count = min(cluster_count or multiprocessing.cpu_count(), shard_count)
+        self.clusters: Dict[int, ClusterInfo] = {
+            cluster_id: ClusterInfo(cluster_id=cluster_id, shard_ids=shard_ids)
+            for cluster_id, shard_ids in enumerate(split_shards(shard_count, cluster_count))
+        }
+
+        self._context = multiprocessing.get_context("spawn")
+        self._shard_clusters = {
+            shard_id: cluster.cluster_id
+            for cluster in self.clusters.values()
+            for shard_id in cluster.shard_ids
+        }
+        self._last_identify: Dict[int, float] = {}
+        self._identify_remaining: int | None = None
+        self._identify_reset_at = 0.0
+        # Identifies of the current quota window are granted from this moment
+        self._identify_window_start = 0.0
+        self._metrics_request_ids = itertools.count()
+        self._running = False
+
+    def cluster_for_guild(self, guild_id: int) -> int:
+        return self._shard_clusters[shard_id_for_guild(guild_id, self.shard_count)]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Metrics aggregated over all clusters"""
+        shards = {}
+        guilds = 0
+
+        for cluster in self.clusters.values():
+            shards.update(cluster.metrics.get("shards", {}))
+            guilds += cluster.metrics.get("guilds", 0)
+
+        latencies = [shard["latency"] for shard in shards.values() if not math.isnan(shard["latency"])]
+        p99_latencies = [shard["latency_p99"] for shard in shards.values() if not math.isnan(shard["latency_p99"])]
+        return {
+            "clusters": len(self.clusters),
+            "alive_clusters": sum(
+                1 for cluster in self.clusters.values()
+                if cluster.process is not None and cluster.process.is_alive()
+            ),
+            "restarts": sum(cluster.restarts for cluster in self.clusters.values()),
+            "guilds": guilds,
+            "latency": sum(latencies) / len(latencies) if latencies else float("nan"),
+            "latency_p99": max(p99_latencies, default=float("nan")),
+            "shards": shards
+        }
+
+    def run(self) -> None:
+        self._running = True
+
+        for cluster in self.clusters.values():
+            self._start_cluster(cluster)
+
+        next_metrics = time.monotonic() + self.metrics_interval
+
+        try:
+            while self._running:
+                connections = {
+                    cluster.connection: cluster
+                    for cluster in self.clusters.values()
+                    if cluster.connection is not None
+                }
+
+                for connection in wait(list(connections), timeout=1):
+                    try:
+                        message = connection.recv()
+                    except (EOFError, OSError):
+                        # Worker is gone, a closed pipe is always readable and would spin this loop
+                        self._disconnect(connections[connection])
+                        continue
+
+                    self._route(message)
+
+                self._supervise()
+
+                if time.monotonic() >= next_metrics:
+                    self._collect_metrics()
+                    next_metrics = time.monotonic() + self.metrics_interval
+        except KeyboardInterrupt:
+            logger.info("Stopping clusters")
+        finally:
+            self._stop()
+
+    def _start_cluster(self, cluster: ClusterInfo) -> None:
+        manager_connection, worker_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_run_cluster,
+            args=(self.client_factory, cluster.cluster_id, cluster.shard_ids, self.shard_count, worker_connection),
+            name=f"quant-cluster-{cluster.cluster_id}"
+        )
+        process.start()
+        worker_connection.close()
+
+        cluster.process = process
+        cluster.connection = manager_connection
+        cluster.restart_at = None
+
+    def _supervise(self) -> None:
+        now = time.monotonic()
+
+        for cluster in self.clusters.values():
+            if cluster.restart_at is not None:
+                if now >= cluster.restart_at:
+                    logger.info("Restarting cluster %s", cluster.cluster_id)
+                    self._start_cluster(cluster)
+
+                continue
+
+            if cluster.process is None or cluster.process.is_alive():
+                continue
+
+            cluster.restarts += 1
+            delay = min(2 ** cluster.restarts, self.max_restart_delay)
+            logger.error(
+                "Cluster %s exited with code %s, restarting in %s seconds",
+                cluster.cluster_id,
+                cluster.process.exitcode,
+                delay
+            )
+
+            self._disconnect(cluster)
+            cluster.restart_at = now + delay
+
+    @staticmethod
+    def _disconnect(cluster: ClusterInfo) -> None:
+        if cluster.connection is not None:
+            cluster.connection.close()
+            cluster.connection = None
+
+    def _route(self, message: Dict[str, Any]) -> None:
+        if message["type"] == _RESPONSE:
+            if message["target"] == MANAGER_ID:
+                self._on_metrics(message)
+                return
+
+            self._send(message["target"], message)
+            return
+
+        target = message["target"]
+        if target == MANAGER_ID:
+            self._handle_manager_request(message)
+            return
+
+        if target is None:
+            target = self.cluster_for_guild(message["guild_id"])
+
+        if not self._send(target, message):
+            self._send(message["source"], {
+                "type": _RESPONSE,
+                "id": message["id"],
+                "target": message["source"],
+                "ok": False,
+                "result": None,
+                "error": f"Cluster {target} is not available"
+            })
+
+    def _handle_manager_request(self, message: Dict[str, Any]) -> None:
+        response = {"type": _RESPONSE, "id": message["id"], "target": message["source"], "ok": True, "result": None}
+
+        match message["method"]:
+            case "identify":
+                response["result"] = self._identify_delay(*message["args"])
+            case "metrics":
+                response["result"] = self.metrics()
+            case _:
+                response.update({"ok": False, "error": f"Unknown manager method: {message['method']}"})
+
+        self._send(message["source"], response)
+
+    def _identify_delay(
+        self,
+        shard_id: int,
+        max_concurrency: int,
+        total: int,
+        remaining: int,
+        reset_after: float
+    ) -> float:
+        # Same rules as IdentifyScheduler, but shared by every cluster
+        now = time.monotonic()
+
+        if self._identify_remaining is None:
+            self._identify_remaining = remaining
+            self._identify_reset_at = now + reset_after
+
+        if self._identify_remaining <= 0:
+            self._identify_window_start = max(now, self._identify_reset_at)
+            logger.warning(
+                "Session start limit exhausted, shard %s waits %.0f seconds before identifying",
+                shard_id,
+                self._identify_window_start - now
+            )
+
+            self._identify_remaining = total
+            self._identify_reset_at = self._identify_window_start + 24 * 60 * 60
+
+        self._identify_remaining -= 1
+        quota_at = max(now, self._identify_window_start)
+
+        key = shard_id % max_concurrency
+        grant_at = max(quota_at, self._last_identify.get(key, now - IDENTIFY_INTERVAL) + IDENTIFY_INTERVAL)
+        self._last_identify[key] = grant_at
+
+        return grant_at - now
+
+    def _collect_metrics(self) -> None:
+        for cluster in self.clusters.values():
+            self._send(cluster.cluster_id, {
+                "type": _REQUEST,
+                "id": next(self._metrics_request_ids),
+                "source": MANAGER_ID,
+                "target": cluster.cluster_id,
+                "guild_id": None,
+                "method": "metrics",
+                "args": (),
+                "kwargs": {}
+            })
+
+    def _on_metrics(self, message: Dict[str, Any]) -> None:
+        if not message["ok"]:
+            return
+
+        metrics = message["result"]
+        self.clusters[metrics["cluster_id"]].metrics = metrics
+
+    def _send(self, cluster_id: int, message: Dict[str, Any]) -> bool:
+        cluster = self.clusters.get(cluster_id)
+        if cluster is None or cluster.connection is None:
+            return False
+
+        try:
+            cluster.connection.send(message)
+        except (OSError, ValueError):
+            return False
+
+        return True
+
+    def _stop(self) -> None:
+        self._running = False
+
+        for cluster in self.clusters.values():
+            if cluster.process is not None:
+                cluster.process.join(timeout=10)
+
+                if cluster.process.is_alive():
+                    cluster.process.terminate()
@@ -0,0 +1,177 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Final, Type
+
+import attrs
+
+from quant.impl.core.exceptions.library_exception import DiscordException
+
+ZLIB_SUFFIX: Final[bytes] = b"\x00\x00\xff\xff"
+ZLIB_STREAM: Final[str] = "zlib-stream"
+ZSTD_STREAM: Final[str] = "zstd-stream"
+
+
+@attrs.define(kw_only=True)
+class CompressionStats:
+    messages: int = attrs.field(default=0)
+    compressed_bytes: int = attrs.field(default=0)
+    inflated_bytes: int = attrs.field(default=0)
+    inflate_time: float = attrs.field(default=0.0)
+
+    @property
+    def ratio(self) -> float:
+        """Inflated to compressed size ratio"""
+        if self.compressed_bytes == 0:
+            return float("nan")
+
+        return self.inflated_bytes / self.compressed_bytes
+
+    @property
+    def average_inflate_time(self) -> float:
+        """Average inflate time per message in seconds"""
+        if self.messages == 0:
+            return float("nan")
+
+        return self.inflate_time / self.messages
+
+
+class TransportCompression(ABC):
+    """Inflates gateway frames of one connection.
+
+    With ``collect_stats`` every frame is timed and counted in :attr:`stats`,
+    which costs about a third of the inflate time, so it's off by default.
+    """
+    name: str = "abstract"
+
+    def __init__(self, collect_stats: bool = False) -> None:
+        self.stats: CompressionStats | None = CompressionStats() if collect_stats else None
+
+        if collect_stats:
+            self.feed = self._feed_with_stats
+
+    @abstractmethod
+    def feed(self, frame: bytes | bytearray) -> bytes | None:
+        """Feed one websocket frame.
+
+        Returns the inflated message when it is complete, otherwise ``None``.
+        The result is handed to the decoder as is, without decoding it to :class:`str`.
+        """
+        raise NotImplementedError
+
+    def _feed_with_stats(self, frame: bytes | bytearray) -> bytes | None:
+        started = time.perf_counter()
+        inflated = type(self).feed(self, frame)
+
+        stats = self.stats
+        stats.inflate_time += time.perf_counter() - started
+        stats.compressed_bytes += len(frame)
+
+        if inflated is not None:
+            stats.messages += 1
+            stats.inflated_bytes += len(inflated)
+
+        return inflated
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drops pending data and starts a new context (required on every new connection)."""
+        raise NotImplementedError
+
+
+class ZlibStreamInflater(TransportCompression):
+    """Incremental inflater for ``compress=zlib-stream`` gateway frames.
+
+    A message is complete only when the frame ends with :data:`ZLIB_SUFFIX`.
+    Single-frame messages (the common case) are inflated straight from the
+    received frame; only split messages are accumulated in the internal buffer.
+    """
+    name = ZLIB_STREAM
+
+    def __init__(self, collect_stats: bool = False) -> None:
+        super().__init__(collect_stats)
+        self._inflator = zlib.decompressobj()
+        self._buffer = bytearray()
+
+    def feed(self, frame: bytes | bytearray) -> bytes | None:
+        if not frame.endswith(ZLIB_SUFFIX):
+            self._buffer += frame
+            return
+
+        if self._buffer:
+            self._buffer += frame
+            inflated = self._inflator.decompress(self._buffer)
+            self._buffer.clear()
+            return inflated
+
+        return self._inflator.decompress(frame)
+
+    def reset(self) -> None:
+        self._inflator = zlib.decompressobj()
+        self._buffer.clear()
+
+
+class ZstdStreamInflater(TransportCompression):
+    """Incremental inflater for ``compress=zstd-stream`` gateway frames.
+
+    Discord flushes the zstd stream after every message, so each websocket
+    frame inflates to exactly one payload. Requires ``zstandard`` package.
+    """
+    name = ZSTD_STREAM
+
+    def __init__(self, collect_stats: bool = False) -> None:
+        super().__init__(collect_stats)
+
+        try:
+            import zstandard
+        except ImportError as exception:
+            raise DiscordException("zstandard is not installed, run `pip install zstandard`") from exception
+
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._inflator = self._decompressor.decompressobj()
+
+    def feed(self, frame: bytes | bytearray) -> bytes | None:
+        inflated = self._inflator.decompress(frame)
+        return inflated or None
+
+    def reset(self) -> None:
+        self._inflator = self._decompressor.decompressobj()
+
+
+_COMPRESSIONS: Dict[str, Type[TransportCompression]] = {
+    ZLIB_STREAM: ZlibStreamInflater,
+    ZSTD_STREAM: ZstdStreamInflater
+}
+
+
+def get_transport_compression(name: str, collect_stats: bool = False) -> TransportCompression:
+    compression_type = _COMPRESSIONS.get(name)
+    if compression_type is None:
+        raise DiscordException(f"Unknown transport compression: {name}. Available: {', '.join(_COMPRESSIONS)}")
+
+    return compression_type(collect_stats)
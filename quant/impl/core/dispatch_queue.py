@@ -0,0 +1,164 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Final, Tuple
+from traceback import print_exception
+
+import attrs
+
+from quant.impl.core.exceptions.library_exception import DiscordException
+from quant.utils import logger
+
+DEFAULT_DISPATCH_QUEUE_SIZE: Final[int] = 10_000
+
+# Reader waits until the dispatcher catches up
+OVERFLOW_BLOCK: Final[str] = "block"
+# Oldest queued event is discarded to make room
+OVERFLOW_DROP_OLDEST: Final[str] = "drop_oldest"
+# Queue grows past its size, a warning is logged
+OVERFLOW_SPILL: Final[str] = "spill"
+
+_OVERFLOW_POLICIES = frozenset({OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL})
+
+
+@attrs.define(kw_only=True)
+class DispatchQueueStats:
+    received: int = attrs.field(default=0)
+    dispatched: int = attrs.field(default=0)
+    dropped: int = attrs.field(default=0)
+    spilled: int = attrs.field(default=0)
+    depth: int = attrs.field(default=0)
+    max_depth: int = attrs.field(default=0)
+    total_lag: float = attrs.field(default=0.0)
+    max_lag: float = attrs.field(default=0.0)
+    last_lag: float = attrs.field(default=0.0)
+
+    @property
+    def average_lag(self) -> float:
+        """Average seconds between receiving a frame and dispatching it"""
+        if self.dispatched == 0:
+            return float("nan")
+
+        return self.total_lag / self.dispatched
+
+
+class DispatchQueue:
+    """Bounded queue between the websocket reader and event handlers.
+
+    Reader keeps reading (and heartbeating) while listeners run,
+    ``overflow`` decides what happens when handlers fall behind.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Dict[str, Any]], Awaitable[None]],
+        maxsize: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        overflow: str = OVERFLOW_BLOCK
+    ) -> None:
+        if overflow not in _OVERFLOW_POLICIES:
+            raise DiscordException(f"Unknown dispatch overflow policy: {overflow}")
+
+        self._handle = handle
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._items: Deque[Tuple[Dict[str, Any], float]] = collections.deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._task: asyncio.Task | None = None
+        self._spilling = False
+        self.stats = DispatchQueueStats()
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        self._items.clear()
+        self.stats.depth = 0
+        self._not_full.set()
+
+    async def put(self, payload: Dict[str, Any]) -> None:
+        stats = self.stats
+        stats.received += 1
+
+        if len(self._items) >= self.maxsize:
+            if self.overflow == OVERFLOW_BLOCK:
+                while len(self._items) >= self.maxsize:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+            elif self.overflow == OVERFLOW_DROP_OLDEST:
+                self._items.popleft()
+                stats.dropped += 1
+            else:
+                if not self._spilling:
+                    self._spilling = True
+                    logger.warning("Dispatch queue is over its size (%s), handlers are falling behind", self.maxsize)
+
+                stats.spilled += 1
+
+        self._items.append((payload, time.perf_counter()))
+        stats.depth = len(self._items)
+        stats.max_depth = max(stats.max_depth, stats.depth)
+        self._not_empty.set()
+
+    async def _run(self) -> None:
+        stats = self.stats
+
+        while True:
+            if not self._items:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+
+            payload, received_at = self._items.popleft()
+            stats.depth = len(self._items)
+
+            if stats.depth < self.maxsize:
+                self._not_full.set()
+                self._spilling = False
+
+            lag = time.perf_counter() - received_at
+            stats.last_lag = lag
+            stats.total_lag += lag
+            stats.max_lag = max(stats.max_lag, lag)
+
+            try:
+                await self._handle(payload)
+            except Exception as exception:
+                print_exception(exception)
+
+            stats.dispatched += 1
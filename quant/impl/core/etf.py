@@ -0,0 +1,287 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Any, Callable, Dict, Final, Tuple
+
+from quant.impl.core.exceptions.library_exception import DiscordException
+
+FORMAT_VERSION: Final[int] = 131
+
+NEW_FLOAT_EXT: Final[int] = 70
+COMPRESSED: Final[int] = 80
+SMALL_INTEGER_EXT: Final[int] = 97
+INTEGER_EXT: Final[int] = 98
+FLOAT_EXT: Final[int] = 99
+ATOM_EXT: Final[int] = 100
+SMALL_TUPLE_EXT: Final[int] = 104
+LARGE_TUPLE_EXT: Final[int] = 105
+NIL_EXT: Final[int] = 106
+STRING_EXT: Final[int] = 107
+LIST_EXT: Final[int] = 108
+BINARY_EXT: Final[int] = 109
+SMALL_BIG_EXT: Final[int] = 110
+LARGE_BIG_EXT: Final[int] = 111
+SMALL_ATOM_EXT: Final[int] = 115
+MAP_EXT: Final[int] = 116
+ATOM_UTF8_EXT: Final[int] = 118
+SMALL_ATOM_UTF8_EXT: Final[int] = 119
+
+_ATOMS: Final[Dict[str, Any]] = {"nil": None, "null": None, "true": True, "false": False}
+
+_unpack_u16 = struct.Struct(">H").unpack_from
+_unpack_u32 = struct.Struct(">I").unpack_from
+_unpack_i32 = struct.Struct(">i").unpack_from
+_unpack_f64 = struct.Struct(">d").unpack_from
+
+_pack_u8 = struct.Struct(">BB").pack
+_pack_i32 = struct.Struct(">Bi").pack
+_pack_u32 = struct.Struct(">BI").pack
+_pack_f64 = struct.Struct(">Bd").pack
+
+
+class ETFException(DiscordException):
+    ...
+
+
+def _atom(name: str) -> Any:
+    return _ATOMS.get(name, name)
+
+
+def _decode(data: bytes, offset: int) -> Tuple[Any, int]:
+    tag = data[offset]
+    offset += 1
+
+    decoder = _DECODERS.get(tag)
+    if decoder is None:
+        raise ETFException(f"Unsupported ETF tag: {tag}")
+
+    return decoder(data, offset)
+
+
+def _decode_small_integer(data: bytes, offset: int) -> Tuple[int, int]:
+    return data[offset], offset + 1
+
+
+def _decode_integer(data: bytes, offset: int) -> Tuple[int, int]:
+    return _unpack_i32(data, offset)[0], offset + 4
+
+
+def _decode_new_float(data: bytes, offset: int) -> Tuple[float, int]:
+    return _unpack_f64(data, offset)[0], offset + 8
+
+
+def _decode_float(data: bytes, offset: int) -> Tuple[float, int]:
+    return float(bytes(data[offset:offset + 31]).rstrip(b"\x00")), offset + 31
+
+
+def _decode_atom(data: bytes, offset: int) -> Tuple[Any, int]:
+    length = _unpack_u16(data, offset)[0]
+    offset += 2
+    return _atom(str(data[offset:offset + length], "latin1")), offset + length
+
+
+def _decode_small_atom(data: bytes, offset: int) -> Tuple[Any, int]:
+    length = data[offset]
+    offset += 1
+    return _atom(str(data[offset:offset + length], "latin1")), offset + length
+
+
+def _decode_atom_utf8(data: bytes, offset: int) -> Tuple[Any, int]:
+    length = _unpack_u16(data, offset)[0]
+    offset += 2
+    return _atom(str(data[offset:offset + length], "utf8")), offset + length
+
+
+def _decode_small_atom_utf8(data: bytes, offset: int) -> Tuple[Any, int]:
+    length = data[offset]
+    offset += 1
+    return _atom(str(data[offset:offset + length], "utf8")), offset + length
+
+
+def _decode_sequence(data: bytes, offset: int, length: int) -> Tuple[list, int]:
+    items = []
+    append = items.append
+
+    for _ in range(length):
+        item, offset = _decode(data, offset)
+        append(item)
+
+    return items, offset
+
+
+def _decode_small_tuple(data: bytes, offset: int) -> Tuple[list, int]:
+    return _decode_sequence(data, offset + 1, data[offset])
+
+
+def _decode_large_tuple(data: bytes, offset: int) -> Tuple[list, int]:
+    return _decode_sequence(data, offset + 4, _unpack_u32(data, offset)[0])
+
+
+def _decode_nil(data: bytes, offset: int) -> Tuple[list, int]:
+    return [], offset
+
+
+def _decode_string(data: bytes, offset: int) -> Tuple[list, int]:
+    # Erlang encodes lists of small integers as STRING_EXT, JSON gives a list for them
+    length = _unpack_u16(data, offset)[0]
+    offset += 2
+    return list(data[offset:offset + length]), offset + length
+
+
+def _decode_list(data: bytes, offset: int) -> Tuple[list, int]:
+    items, offset = _decode_sequence(data, offset + 4, _unpack_u32(data, offset)[0])
+    # Proper lists end with NIL_EXT, improper tails are not used by Discord
+    _, offset = _decode(data, offset)
+    return items, offset
+
+
+def _decode_binary(data: bytes, offset: int) -> Tuple[str, int]:
+    length = _unpack_u32(data, offset)[0]
+    offset += 4
+    return str(data[offset:offset + length], "utf8"), offset + length
+
+
+def _decode_big(data: bytes, offset: int, length: int) -> Tuple[int, int]:
+    sign = data[offset]
+    offset += 1
+    value = int.from_bytes(data[offset:offset + length], "little")
+    return -value if sign else value, offset + length
+
+
+def _decode_small_big(data: bytes, offset: int) -> Tuple[int, int]:
+    return _decode_big(data, offset + 1, data[offset])
+
+
+def _decode_large_big(data: bytes, offset: int) -> Tuple[int, int]:
+    return _decode_big(data, offset + 4, _unpack_u32(data, offset)[0])
+
+
+def _decode_map(data: bytes, offset: int) -> Tuple[dict, int]:
+    arity = _unpack_u32(data, offset)[0]
+    offset += 4
+    result = {}
+
+    for _ in range(arity):
+        key, offset = _decode(data, offset)
+        value, offset = _decode(data, offset)
+        result[key] = value
+
+    return result, offset
+
+
+_DECODERS: Final[Dict[int, Callable[[bytes, int], Tuple[Any, int]]]] = {
+    SMALL_INTEGER_EXT: _decode_small_integer,
+    INTEGER_EXT: _decode_integer,
+    NEW_FLOAT_EXT: _decode_new_float,
+    FLOAT_EXT: _decode_float,
+    ATOM_EXT: _decode_atom,
+    SMALL_ATOM_EXT: _decode_small_atom,
+    ATOM_UTF8_EXT: _decode_atom_utf8,
+    SMALL_ATOM_UTF8_EXT: _decode_small_atom_utf8,
+    SMALL_TUPLE_EXT: _decode_small_tuple,
+    LARGE_TUPLE_EXT: _decode_large_tuple,
+    NIL_EXT: _decode_nil,
+    STRING_EXT: _decode_string,
+    LIST_EXT: _decode_list,
+    BINARY_EXT: _decode_binary,
+    SMALL_BIG_EXT: _decode_small_big,
+    LARGE_BIG_EXT: _decode_large_big,
+    MAP_EXT: _decode_map
+}
+
+
+def loads(data: bytes | bytearray | memoryview) -> Any:
+    """Decodes ETF payload into python objects.
+
+    Atoms become :class:`str` (``nil``/``true``/``false`` become ``None``/``True``/``False``),
+    binaries become :class:`str` and maps become :class:`dict` - the same shapes JSON decoding gives.
+
+    The decoder is pure python and 4-7x slower than stdlib JSON decoding, payloads
+    are not smaller either (see ``benchmarks/etf_decode.py``). ETF is here for compatibility,
+    use JSON for performance.
+    """
+    if data[0] != FORMAT_VERSION:
+        raise ETFException(f"Unknown ETF version: {data[0]}")
+
+    if data[1] == COMPRESSED:
+        data = zlib.decompress(data[6:])
+        value, _ = _decode(data, 0)
+        return value
+
+    value, _ = _decode(data, 1)
+    return value
+
+
+def _encode(value: Any, buffer: bytearray) -> None:
+    if value is None:
+        buffer += b"\x77\x03nil"
+    elif value is True:
+        buffer += b"\x77\x04true"
+    elif value is False:
+        buffer += b"\x77\x05false"
+    elif isinstance(value, int):
+        if 0 <= value <= 255:
+            buffer += _pack_u8(SMALL_INTEGER_EXT, value)
+        elif -2 ** 31 <= value < 2 ** 31:
+            buffer += _pack_i32(INTEGER_EXT, value)
+        else:
+            magnitude = abs(value)
+            encoded = magnitude.to_bytes((magnitude.bit_length() + 7) // 8, "little")
+            buffer += bytes((SMALL_BIG_EXT, len(encoded), 1 if value < 0 else 0))
+            buffer += encoded
+    elif isinstance(value, float):
+        buffer += _pack_f64(NEW_FLOAT_EXT, value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf8")
+        buffer += _pack_u32(BINARY_EXT, len(encoded))
+        buffer += encoded
+    elif isinstance(value, bytes | bytearray):
+        buffer += _pack_u32(BINARY_EXT, len(value))
+        buffer += value
+    elif isinstance(value, dict):
+        buffer += _pack_u32(MAP_EXT, len(value))
+
+        for key, item in value.items():
+            _encode(key, buffer)
+            _encode(item, buffer)
+    elif isinstance(value, list | tuple):
+        if value:
+            buffer += _pack_u32(LIST_EXT, len(value))
+
+            for item in value:
+                _encode(item, buffer)
+
+        buffer.append(NIL_EXT)
+    else:
+        raise ETFException(f"Can't encode {type(value).__name__} to ETF")
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes python object to ETF payload."""
+    buffer = bytearray((FORMAT_VERSION,))
+    _encode(value, buffer)
+    return bytes(buffer)
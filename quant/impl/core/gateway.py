@@ -23,40 +23,70 @@ SOFTWARE.
 """
 from __future__ import annotations
 
+import re
 import sys
 import enum
 import time
 import zlib
+import random
+import asyncio
 from typing import (
-    NoReturn,
+    Final,
     TypeVar,
     List,
     TYPE_CHECKING
 )
-import asyncio
 from traceback import print_exception
 
-import json
 import attrs
 import aiohttp
 
 if TYPE_CHECKING:
     from quant.impl.core.client import Client
     from quant.entities.snowflake import Snowflake, SnowflakeOrInt
+    from quant.impl.core.recorder import FrameRecorder
 
 from quant.impl.core.exceptions.library_exception import DiscordException
 from quant.impl.events.bot.raw_event import RawDispatchEvent, _GatewayData
+from quant.impl.events.guild.guild_create_event import GuildAvailableEvent
 from quant.entities.activity import Activity, ActivityStatus
 from quant.impl.core.route import Gateway as GatewayRoute
+from quant.impl.core.compression import TransportCompression, ZLIB_STREAM, get_transport_compression
+from quant.impl.core import etf
+from quant.impl.core.heartbeat import Heartbeat, Latency
+from quant.impl.core.session_store import SessionState
+from quant.impl.core.cluster import shard_id_for_guild
+from quant.impl.core.dispatch_queue import DispatchQueue, DEFAULT_DISPATCH_QUEUE_SIZE, OVERFLOW_BLOCK
+from quant.impl.core.supervisor import ShardState
+from quant.impl.core.send_queue import GatewaySendQueue, SendWindow, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
 from quant.entities.intents import Intents
 from quant.utils import logger
 
-_ZLIB_SUFFIX = b"\x00\x00\xff\xff"
 _CUSTOM_STATUS = "Custom Status"
 
 WSMessageT = TypeVar("WSMessageT", bound=str | bytes)
 
 READY = "READY"
+GUILD_CREATE = "GUILD_CREATE"
+
+JSON_ENCODING = "json"
+ETF_ENCODING = "etf"
+
+# Discord serializes dispatch payloads as {"t":"EVENT_NAME","s":123,"op":0,"d":{...}}
+_DISPATCH_PEEK = re.compile(rb'\{"t":"([A-Z_]+)","s":(\d+),')
+RESUMED = "RESUMED"
+GUILD_MEMBERS_CHUNK = "GUILD_MEMBERS_CHUNK"
+_GATEWAY_EVENTS = frozenset({READY, RESUMED, GUILD_MEMBERS_CHUNK})
+
+# Frames this large (compressed) are inflated and parsed in a worker thread
+DEFAULT_OFFLOAD_THRESHOLD: Final[int] = 64 * 1024
+
+# Closing with anything but 1000/1001 keeps the session resumable
+RESUMABLE_CLOSE_CODE: Final[int] = 4000
+# Session can't be resumed after these, a new IDENTIFY is required
+_REIDENTIFY_CLOSE_CODES = frozenset({4007, 4009})
+# Reconnecting won't help: bad token, shard, intents or API version
+_FATAL_CLOSE_CODES = frozenset({4004, 4010, 4011, 4012, 4013, 4014})
 
 
 class OpCode(enum.IntEnum):
@@ -73,6 +103,15 @@ class OpCode(enum.IntEnum):
     HEARTBEAT_ACK = 11
 
 
+# Never queued: they keep the session alive and come from budget reserved in the send queue
+_BYPASS_OPCODES = frozenset({OpCode.HEARTBEAT, OpCode.IDENTIFY, OpCode.RESUME})
+_OPCODE_PRIORITIES = {
+    OpCode.VOICE_STATE_UPDATE: PRIORITY_HIGH,
+    OpCode.REQUEST_GUILD_MEMBERS: PRIORITY_NORMAL,
+    OpCode.PRESENCE_UPDATE: PRIORITY_LOW
+}
+
+
 @attrs.define
 class IdentifyProperties:
     os: str = attrs.field()
@@ -89,6 +128,35 @@ class IdentifyPayload:
     intents: Intents = attrs.field(default=Intents.ALL_PRIVILEGED)
 
 
+@attrs.define(kw_only=True)
+class ResumeStats:
+    attempts: int = attrs.field(default=0)
+    successes: int = attrs.field(default=0)
+    failures: int = attrs.field(default=0)
+
+    @property
+    def success_rate(self) -> float:
+        if self.attempts == 0:
+            return float("nan")
+
+        return self.successes / self.attempts
+
+
+@attrs.define(kw_only=True)
+class OffloadStats:
+    frames: int = attrs.field(default=0)
+    bytes: int = attrs.field(default=0)
+    total_time: float = attrs.field(default=0.0)
+    max_time: float = attrs.field(default=0.0)
+
+    @property
+    def average_time(self) -> float:
+        if self.frames == 0:
+            return float("nan")
+
+        return self.total_time / self.frames
+
+
 class Gateway:
     def __init__(
         self,
@@ -97,10 +165,29 @@ class Gateway:
         shard_id: int = 0,
         num_shards: int = 1,
         session: aiohttp.ClientSession | None = None,
-        mobile: bool = False
+        mobile: bool = False,
+        encoding: str = JSON_ENCODING,
+        compression: str = ZLIB_STREAM,
+        compression_stats: bool = False,
+        dispatch_queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        dispatch_overflow: str = OVERFLOW_BLOCK,
+        offload_threshold: int | None = DEFAULT_OFFLOAD_THRESHOLD,
+        recorder: FrameRecorder | None = None,
+        url: str | None = None
     ) -> None:
         self.client = client
+        self.supervisor = client.supervisor
         self.loop = client.loop
+        self.codec = client.codec
+        self.encoding = encoding
+
+        if encoding == JSON_ENCODING:
+            self._loads, self._dumps = self.codec.loads, self.codec.dumps
+        elif encoding == ETF_ENCODING:
+            self._loads, self._dumps = etf.loads, etf.dumps
+        else:
+            raise DiscordException(f"Unsupported gateway encoding: {encoding}")
+
         self.session = session
         self.websocket: aiohttp.ClientWebSocketResponse | None = None
         self.identify = IdentifyPayload(
@@ -113,95 +200,369 @@ class Gateway:
             large_threshold=250,
             intents=intents
         )
-        self._buffer = bytearray()
-        self._inflator = zlib.decompressobj()
+        self._inflater: TransportCompression = get_transport_compression(compression, collect_stats=compression_stats)
 
         self._sequence: int | None = None
-        self._interval: float | None = None
-        self._session_id: int | None = None
-        self._heartbeat = 0
-
-        self.ws_url: str = GatewayRoute.DISCORD_WS_URL.uri.url_string.format(10)
+        # Sequence of the last event handed to listeners, saved sessions resume from it
+        self._dispatched_sequence: int | None = None
+        self._session_id: str | None = None
+        self._resuming = False
+        self._running = False
+        self._identify_task: asyncio.Task | None = None
+        self._connect_started: float | None = None
+        self.ready_time: float | None = None
+        self.heartbeat = Heartbeat(self)
+        self.resume_stats = ResumeStats()
+        self.offload_threshold = offload_threshold
+        self.offload_stats = OffloadStats()
+        self.recorder = recorder
+        self.send_window = SendWindow()
+        self.send_queue = GatewaySendQueue(self._send_raw, window=self.send_window)
+        self.dispatch_queue = DispatchQueue(self._handle_dispatch, maxsize=dispatch_queue_size, overflow=dispatch_overflow)
+
+        self._options = GatewayRoute.OPTIONS.format(encoding=encoding, compress=compression)
+        if url is not None:
+            self.ws_url = f"{url.rstrip('/')}/{self._options}"
+        else:
+            self.ws_url: str = GatewayRoute.DISCORD_WS_URL.uri.url_string.format(
+                encoding=encoding,
+                compress=compression
+            )
         self.resume_url: str | None = None
 
-    async def connect(self) -> NoReturn:
-        self.session = aiohttp.ClientSession()
-        self.websocket = await self.session.ws_connect(url=self.ws_url if self.resume_url is None else self.resume_url)
+    @property
+    def can_resume(self) -> bool:
+        return self._session_id is not None and self._sequence is not None
 
-        logger.info(
-            "Connecting to shard with ID %s (total shard count: %s)",
-            self.identify.shard[0],
-            len(self.client.shards) or 1
-        )
+    async def connect(self) -> None:
+        self._running = True
+
+        if self._connect_started is None:
+            self._connect_started = time.perf_counter()
+
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+
+        self.send_queue.start(self.loop)
+        self.dispatch_queue.start(self.loop)
+
+        shard_id = self.identify.shard[0]
+
+        while self._running:
+            self.send_queue.pause()
+
+            await self.supervisor.before_connect(shard_id)
+            if not self._running:
+                break
+
+            url = self.ws_url
+            if self.can_resume and self.resume_url is not None:
+                url = f"{self.resume_url}/{self._options}"
+
+            logger.info(
+                "Connecting to shard with ID %s (total shard count: %s)",
+                self.identify.shard[0],
+                self.identify.shard[1]
+            )
 
-        await self._send_identify()
+            self._inflater.reset()
+            self.supervisor.set_state(shard_id, ShardState.CONNECTING)
+
+            try:
+                self.websocket = await self.session.ws_connect(url=url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
+                logger.error("Shard %s failed to connect: %s", shard_id, exception)
+                self.supervisor.failed(shard_id, exception)
+                continue
+
+            if self.recorder is not None:
+                self.recorder.mark_connect()
 
-        while not self.websocket.closed:
             await self._websocket_read()
-            await self._keep_alive()
+            self.heartbeat.stop()
+
+            if not self._running:
+                break
+
+            close_code = self.websocket.close_code
+            if close_code in _FATAL_CLOSE_CODES:
+                logger.error("Shard %s can't reconnect (close code: %s)", shard_id, close_code)
+                self._running = False
+                self.supervisor.set_state(shard_id, ShardState.DEAD)
+                # Nothing will be sent anymore, don't leave callers waiting
+                self.send_queue.stop()
+                break
 
-    async def close(self, code: int = 4000):
+            self.supervisor.disconnected(shard_id, close_code)
+
+            if close_code in _REIDENTIFY_CLOSE_CODES:
+                self._reset_session()
+
+    async def close(self, code: int = 1000):
         logger.info("Connection closing, code: %s", code)
 
-        await self.session.close()
-        if not self.websocket:
-            self._buffer.clear()
+        self._running = False
+        self.supervisor.set_state(self.identify.shard[0], ShardState.DEAD)
+        self.heartbeat.stop()
+        self.send_queue.stop()
+        self.dispatch_queue.stop()
+
+        if self._identify_task is not None:
+            self._identify_task.cancel()
+
+        if self.websocket is not None:
+            await self.websocket.close(code=code)
+
+        if self.session is not None:
+            await self.session.close()
+
+        self._inflater.reset()
+
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def owns_guild(self, guild_id: SnowflakeOrInt) -> bool:
+        """Whether guild events and guild-scoped opcodes belong to this shard"""
+        shard_id, num_shards = self.identify.shard
+        return shard_id_for_guild(guild_id, num_shards) == shard_id
+
+    def session_state(self) -> SessionState | None:
+        if not self.can_resume:
             return
 
-        await self.websocket.close(code=code)
+        return SessionState(
+            shard_id=self.identify.shard[0],
+            num_shards=self.identify.shard[1],
+            session_id=self._session_id,
+            # Events still in the dispatch queue are replayed by Discord after resuming
+            sequence=self._dispatched_sequence if self._dispatched_sequence is not None else self._sequence,
+            resume_url=self.resume_url
+        )
+
+    def restore_session(self, state: SessionState) -> None:
+        self._session_id = state.session_id
+        self._sequence = state.sequence
+        self._dispatched_sequence = state.sequence
+        self.resume_url = state.resume_url
 
-        self._buffer.clear()
+    def _reset_session(self) -> None:
+        self._session_id = None
+        self._sequence = None
+        self._dispatched_sequence = None
+        self.resume_url = None
+
+    @property
+    def latency(self) -> Latency:
+        return self.heartbeat.latency
+
+    @property
+    def compression(self) -> TransportCompression:
+        return self._inflater
 
     def on_websocket_message(self, message: WSMessageT) -> dict | None:
-        self._buffer.extend(message)
+        if isinstance(message, str):
+            return self.codec.loads(message)
+
+        try:
+            inflated = self._inflater.feed(message)
+        except zlib.error as exception:
+            logger.error("Failed to inflate gateway frame: %s", exception)
+            return
 
-        if len(message) < 4 or message[-4:] != _ZLIB_SUFFIX:
+        if inflated is None:
             return
 
-        message = self._inflator.decompress(self._buffer)
-        try:
-            self._buffer = bytearray()
-            return json.loads(message.decode("utf8"))
-        except zlib.error:
+        if self.encoding == JSON_ENCODING and self._skip_unsubscribed(inflated):
             return
 
+        return self._loads(inflated)
+
+    async def _offload_websocket_message(self, message: WSMessageT) -> dict | None:
+        # Reader awaits the result before reading the next frame,
+        # so the stream inflater still sees frames in order
+        started = time.perf_counter()
+        performed_message = await self.loop.run_in_executor(None, self.on_websocket_message, message)
+        elapsed = time.perf_counter() - started
+
+        stats = self.offload_stats
+        stats.frames += 1
+        stats.bytes += len(message)
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+
+        return performed_message
+
+    def _skip_unsubscribed(self, message: bytes) -> bool:
+        peeked = _DISPATCH_PEEK.match(message)
+        if peeked is None:
+            return False
+
+        event_name = peeked[1].decode("ascii")
+        if event_name in _GATEWAY_EVENTS or self.client.event_factory.is_subscribed(event_name):
+            return False
+
+        self._sequence = int(peeked[2])
+        if self.dispatch_queue.depth == 0:
+            self._dispatched_sequence = self._sequence
+
+        return True
+
     async def opcode_validator(self, message: WSMessageT) -> None:
-        performed_message = self.on_websocket_message(message)
+        # Runs in the reader: session state and control opcodes only, events go to the dispatch queue
+        if self.offload_threshold is not None and len(message) >= self.offload_threshold:
+            performed_message = await self._offload_websocket_message(message)
+        else:
+            performed_message = self.on_websocket_message(message)
 
         if performed_message is None:
             return
 
-        self._sequence = performed_message.get("s")
+        if (sequence := performed_message.get("s")) is not None:
+            self._sequence = sequence
+
         opcode, data = (
             performed_message.get("op"),
             performed_message.get("d")
         )
 
-        await self.client.event_controller.dispatch(RawDispatchEvent(data=_GatewayData(**performed_message)))
-
         match opcode:
             case OpCode.DISPATCH:
                 received_event_type = performed_message.get("t")
-                event_details = data
-
-                self.client.event_factory.cache_item(received_event_type, **event_details)
-                await self.client.event_controller.dispatch(received_event_type, event_details)
 
                 if received_event_type == READY:
-                    self.resume_url = event_details.get("resume_gateway_url")
+                    self._session_id = data.get("session_id")
+                    self.resume_url = data.get("resume_gateway_url")
 
-                    self.client.me = self.client.cache.get_users()[0]
-            case OpCode.INVALID_SESSION:
-                logger.warn("Invalid session. Reconnecting.")
+                    self.supervisor.set_state(self.identify.shard[0], ShardState.READY)
 
-                await self.reconnect(code=4000)
+                    if self.ready_time is None:
+                        self.ready_time = time.perf_counter() - self._connect_started
+                        logger.info("Shard %s ready in %.2f seconds", self.identify.shard[0], self.ready_time)
+
+                if received_event_type == RESUMED:
+                    self._resuming = False
+                    self.resume_stats.successes += 1
+                    self.supervisor.set_state(self.identify.shard[0], ShardState.READY)
+                    logger.info("Shard %s resumed session", self.identify.shard[0])
+
+                if received_event_type == GUILD_MEMBERS_CHUNK:
+                    # Resolved here, a listener awaiting fetch_members would block the dispatch consumer
+                    self.client.member_chunker.handle_chunk(data)
+            case OpCode.INVALID_SESSION:
+                await self._handle_invalid_session(resumable=bool(data))
             case OpCode.HELLO:
-                await self._send_hello(data.get("heartbeat_interval"))
+                self.heartbeat.start(data.get("heartbeat_interval") / 1000)
+                self._start_identify()
+            case OpCode.HEARTBEAT:
+                await self.heartbeat.beat()
+            case OpCode.HEARTBEAT_ACK:
+                self.heartbeat.ack()
             case OpCode.RECONNECT:
-                await self.close(code=1012)
+                await self.reconnect(code=RESUMABLE_CLOSE_CODE)
+
+        await self.dispatch_queue.put(performed_message)
+
+    async def _handle_dispatch(self, performed_message: dict) -> None:
+        event_factory = self.client.event_factory
+        opcode = performed_message.get("op")
+        received_event_type = performed_message.get("t")
+
+        # Built only when a raw listener asked for this frame
+        if event_factory.wants_raw(opcode, received_event_type):
+            await self.client.event_controller.dispatch(RawDispatchEvent(data=_GatewayData(**performed_message)))
+
+        if opcode != OpCode.DISPATCH:
+            return
+
+        try:
+            await self._dispatch_event(received_event_type, performed_message.get("d"))
+        finally:
+            if (sequence := performed_message.get("s")) is not None:
+                self._dispatched_sequence = sequence
+
+    async def _dispatch_event(self, received_event_type: str, event_details: dict) -> None:
+        event_factory = self.client.event_factory
+        guild = None
+
+        if received_event_type == GUILD_CREATE:
+            # Large guilds yield to the loop while cached, this consumer waits so events stay ordered
+            guild = await event_factory.cache_guild(event_details)
+        else:
+            event_factory.cache_item(received_event_type, **event_details)
+
+        await self.client.event_controller.dispatch(received_event_type, event_details)
+        # MessageDeleteEvent took the cached message when it was built, with concurrent or
+        # partitioned dispatch its listeners may run after this and won't find it in the cache
+        event_factory.evict_item(received_event_type, **event_details)
+
+        if guild is not None:
+            await self.client.event_controller.dispatch(
+                event_factory.build_from_class(GuildAvailableEvent(), guild),
+                partition=self.client.event_controller.partition_key(received_event_type, event_details)
+            )
+
+        if received_event_type == READY:
+            self.client.me = self.client.cache.get_users()[0]
+
+        if received_event_type == RESUMED and self.client.me is None:
+            await self._rehydrate_me()
+
+    async def _rehydrate_me(self) -> None:
+        # Session restored from a SessionStore never receives READY
+        try:
+            me = await self.client.rest.fetch_current_user()
+        except Exception as exception:
+            logger.error("Can't fetch current user after resume: %s", exception)
+            return
+
+        self.client.cache.add_user(me)
+        self.client.me = me
+
+    async def _handle_invalid_session(self, resumable: bool) -> None:
+        if self._resuming:
+            self._resuming = False
+            self.resume_stats.failures += 1
+
+        if resumable and self.can_resume:
+            logger.warning("Invalid session (resumable). Resuming.")
+            await self.reconnect(code=RESUMABLE_CLOSE_CODE)
+            return
+
+        logger.warning("Invalid session. Identifying.")
+        self._reset_session()
+
+        # Discord asks to wait a random 1-5 seconds before identifying again
+        self._start_identify(delay=random.uniform(1, 5))
+
+    def _start_identify(self, delay: float = 0) -> None:
+        # Waiting for the identify scheduler must not block reading the socket
+        if self._identify_task is not None:
+            self._identify_task.cancel()
+
+        self._identify_task = self.loop.create_task(self._identify_or_resume(delay))
+
+    async def _identify_or_resume(self, delay: float = 0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.can_resume:
+            self.supervisor.set_state(self.identify.shard[0], ShardState.RESUMING)
+            await self._send_resume()
+        else:
+            self.supervisor.set_state(self.identify.shard[0], ShardState.IDENTIFYING)
+            scheduler = self.client.identify_scheduler
+            if scheduler is not None:
+                await scheduler.acquire(self.identify.shard[0])
+
+            await self._send_identify()
+
+        self.send_queue.resume()
 
     async def _websocket_read(self) -> None:
         async for message in self.websocket:
+            if self.recorder is not None and message.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                self.recorder.record(message.data)
+
             try:
                 await self.opcode_validator(message.data)
             except Exception as e:
@@ -212,39 +573,44 @@ class Gateway:
                 logger.error("Gateway received close code: %s", close_code)
                 break
 
-    async def _send(self, data) -> None:
-        try:
-            await self.websocket.send_str(data)
-        except ConnectionResetError as exception:
-            logger.error("Error in send: %s", exception)
-            await self.close(code=4000)
-            await self.connect()
-
-    async def _send_heartbeat(self, interval: float) -> None:
-        payload = self.payload(opcode=OpCode.HEARTBEAT, sequence=self._sequence)
-
-        self._heartbeat = time.perf_counter()
-
-        await self._send(payload)
-        await asyncio.sleep(interval)
+    async def _send(self, data: str | bytes, opcode: OpCode) -> None:
+        if opcode in _BYPASS_OPCODES:
+            await self._send_raw(data)
+            return
 
-        self.loop.create_task(self._send_heartbeat(interval))
+        await self.send_queue.put(
+            data,
+            priority=_OPCODE_PRIORITIES.get(opcode, PRIORITY_NORMAL),
+            # Only the latest presence matters, older queued ones are replaced
+            coalesce_key=opcode if opcode == OpCode.PRESENCE_UPDATE else None
+        )
 
-    async def _send_hello(self, heartbeat_interval: float) -> None:
-        seconds_interval = heartbeat_interval / 1000
-        await asyncio.sleep((seconds_interval - 2000) / 1000)
+    async def _send_raw(self, data: str | bytes) -> None:
+        # Heartbeats, IDENTIFY and RESUME count against the limit too
+        self.send_window.record()
 
-        self.loop.create_task(self._send_heartbeat(seconds_interval))
+        try:
+            if isinstance(data, bytes):
+                await self.websocket.send_bytes(data)
+            else:
+                await self.websocket.send_str(data)
+        except ConnectionResetError as exception:
+            logger.error("Error in send: %s", exception)
+            await self.reconnect(code=RESUMABLE_CLOSE_CODE)
 
-        self._buffer.clear()
+    async def send_heartbeat(self) -> None:
+        await self._send(self.payload(opcode=OpCode.HEARTBEAT, data=self._sequence), OpCode.HEARTBEAT)
 
     async def _send_identify(self) -> None:
         await self._send(self.payload(
             opcode=OpCode.IDENTIFY,
             data=attrs.asdict(self.identify)  # type: ignore
-        ))
+        ), OpCode.IDENTIFY)
 
     async def _send_resume(self) -> None:
+        self._resuming = True
+        self.resume_stats.attempts += 1
+
         payload = self.payload(
             opcode=OpCode.RESUME,
             data={
@@ -253,14 +619,7 @@ class Gateway:
                 "seq": self._sequence
             }
         )
-        await self._send(payload)
-
-    async def _keep_alive(self) -> None:
-        await asyncio.sleep(20)
-
-        if (self._heartbeat + float(60)) < time.perf_counter():
-            logger.info("Reconnecting (keep alive)")
-            await self.reconnect(code=4000)
+        await self._send(payload, OpCode.RESUME)
 
     async def send_presence(
         self,
@@ -302,18 +661,19 @@ class Gateway:
             opcode=OpCode.PRESENCE_UPDATE,
             data=presence
         )
-        await self._send(payload)
+        await self._send(payload, OpCode.PRESENCE_UPDATE)
 
-    async def reconnect(self, code: int) -> None:
-        logger.info("Reconnecting (code: %s)", code)
+    async def reconnect(self, code: int = RESUMABLE_CLOSE_CODE) -> None:
+        """Closes current websocket, :meth:`connect` loop opens a new one.
 
-        await self.close(code=code)
+        Session is resumed when possible, otherwise shard identifies again.
+        """
+        logger.info("Reconnecting (code: %s)", code)
 
-        if code == 4000:
-            await self._send_resume()
-            return
+        self.heartbeat.stop()
 
-        await self.connect()
+        if self.websocket is not None and not self.websocket.closed:
+            await self.websocket.close(code=code)
 
     async def voice_connect(
         self,
@@ -322,6 +682,10 @@ class Gateway:
         self_mute: bool = False,
         self_deaf: bool = False
     ) -> None:
+        if not self.owns_guild(guild_id):
+            await self.client.voice_connect(guild_id, channel_id, self_mute=self_mute, self_deaf=self_deaf)
+            return
+
         payload = self.payload(
             opcode=OpCode.VOICE_STATE_UPDATE,
             data={
@@ -332,7 +696,7 @@ class Gateway:
             }
         )
 
-        await self._send(payload)
+        await self._send(payload, OpCode.VOICE_STATE_UPDATE)
 
     async def request_guild_members(
         self,
@@ -343,16 +707,30 @@ class Gateway:
         user_ids: List[Snowflake] | None = None,
         nonce: str | None = None
     ) -> None:
+        if not self.owns_guild(guild_id):
+            await self.client.request_guild_members(
+                guild_id,
+                query=query,
+                limit=limit,
+                presences=presences,
+                user_ids=user_ids,
+                nonce=nonce
+            )
+            return
+
         body = {"guild_id": guild_id, "limit": limit}
 
         if Intents.GUILD_PRESENCES & self.client.intents:
             body["presences"] = presences
 
-        if query == "" and limit <= 0:
-            if not Intents.GUILD_MEMBERS & self.client.intents:
+        if query is None and user_ids is None:
+            query = ""
+
+        if query is not None:
+            if query == "" and limit <= 0 and not Intents.GUILD_MEMBERS & self.client.intents:
                 raise DiscordException("You need GUILD_MEMBERS intent")
 
-            body.update({"query": query, "limit": limit})
+            body["query"] = query
 
         if nonce is not None:
             body["nonce"] = nonce
@@ -365,17 +743,17 @@ class Gateway:
             data=body
         )
 
-        await self._send(payload)
+        await self._send(payload, OpCode.REQUEST_GUILD_MEMBERS)
 
-    @staticmethod
     def payload(
+        self,
         opcode: OpCode | int,
         data: dict | str | None = None,
         sequence: int | None = None,
         event_name: str | None = None
-    ) -> str | None:
+    ) -> str | bytes:
         payload = {"op": opcode if isinstance(opcode, int) else opcode.value, "d": data}
         if opcode == OpCode.DISPATCH:
             payload.update({"s": sequence, "t": event_name})
 
-        return json.dumps(payload)
+        return self._dumps(payload)
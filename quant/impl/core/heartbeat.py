@@ -0,0 +1,128 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, TYPE_CHECKING
+
+import attrs
+
+if TYPE_CHECKING:
+    from quant.impl.core.gateway import Gateway
+
+from quant.utils import logger
+
+ZOMBIE_CLOSE_CODE = 4000
+
+
+@attrs.define(kw_only=True, frozen=True)
+class Latency:
+    last: float = attrs.field(default=float("nan"))
+    p50: float = attrs.field(default=float("nan"))
+    p99: float = attrs.field(default=float("nan"))
+
+
+def _percentile(sorted_samples: list, percent: float) -> float:
+    index = round(percent / 100 * (len(sorted_samples) - 1))
+    return sorted_samples[index]
+
+
+class Heartbeat:
+    """Keeps one heartbeat task per gateway connection.
+
+    The first beat is delayed by ``interval * random()`` as Discord requires.
+    Every beat must be acknowledged before the next one, otherwise the
+    connection is treated as zombie and the gateway reconnects.
+    """
+
+    def __init__(self, gateway: Gateway, window: int = 100) -> None:
+        self.gateway = gateway
+        self.interval: float | None = None
+        self.zombie_reconnects = 0
+
+        self._task: asyncio.Task | None = None
+        self._sent_at: float | None = None
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._last = float("nan")
+
+    @property
+    def latency(self) -> Latency:
+        if not self._samples:
+            return Latency(last=self._last)
+
+        samples = sorted(self._samples)
+        return Latency(
+            last=self._last,
+            p50=_percentile(samples, 50),
+            p99=_percentile(samples, 99)
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, interval: float) -> None:
+        self.stop()
+
+        self.interval = interval
+        self._sent_at = None
+        self._task = self.gateway.loop.create_task(self._run(interval))
+
+    def stop(self) -> None:
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+        self._task = None
+
+    def ack(self) -> None:
+        if self._sent_at is None:
+            return
+
+        self._last = time.perf_counter() - self._sent_at
+        self._samples.append(self._last)
+        self._sent_at = None
+
+    async def beat(self) -> None:
+        self._sent_at = time.perf_counter()
+        await self.gateway.send_heartbeat()
+
+    async def _run(self, interval: float) -> None:
+        await asyncio.sleep(interval * random.random())
+
+        while True:
+            if self._sent_at is not None:
+                self.zombie_reconnects += 1
+                logger.warning(
+                    "Shard %s missed heartbeat ACK, reconnecting (zombie connection)",
+                    self.gateway.identify.shard[0]
+                )
+                self._task = None
+                await self.gateway.reconnect(code=ZOMBIE_CLOSE_CODE)
+                return
+
+            await self.beat()
+            await asyncio.sleep(interval)
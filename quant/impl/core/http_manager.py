@@ -23,13 +23,13 @@ SOFTWARE.
 """
 import asyncio
 import http
-import json
 from typing import Dict, Any, TypeVar, Tuple
 from datetime import datetime
 
 from aiohttp import ClientSession, ClientResponse, FormData
 
 from quant.utils import logger, parser
+from quant.utils.json_codec import JSONCodec, get_codec
 from quant.api.core.http_manager_abc import HttpManager, AcceptContentType
 from quant.entities.ratelimits.ratelimit import RateLimit, RateLimitBucketReset, Bucket
 from quant.impl.core.exceptions.http_exception import Forbidden, InternalServerError, HTTPException
@@ -39,8 +39,9 @@ HeadersT = TypeVar("HeadersT", bound=Dict[str, Any] | None)
 
 
 class HttpManagerImpl(HttpManager):
-    def __init__(self, authorization: str | None = None) -> None:
+    def __init__(self, authorization: str | None = None, codec: JSONCodec | None = None) -> None:
         self.authorization = authorization
+        self.codec = get_codec(codec)
         self.max_retries = 3
         self.session = ClientSession()
 
@@ -77,7 +78,7 @@ class HttpManagerImpl(HttpManager):
                 bucket_reset=bucket_reset_time
             )
 
-        response_data: Dict = await response.json()
+        response_data: Dict = await response.json(loads=self.codec.loads)
         retry_after, message, is_global, code = (
             response_data.get("retry_after"),
             response_data.get("message"),
@@ -140,7 +141,7 @@ class HttpManagerImpl(HttpManager):
 
         async def perform_request() -> Tuple[ClientResponse, Bucket]:
             if data is not None:
-                request_data["data"] = json.dumps(data)
+                request_data["data"] = self.codec.dumps(data)
 
             if form_data is not None:
                 request_data["data"] = form_data
@@ -0,0 +1,90 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, Final
+
+from quant.entities.gateway import SessionStartLimitObject
+from quant.utils import logger
+
+IDENTIFY_INTERVAL: Final[float] = 5.0
+
+
+class IdentifyScheduler:
+    """Orders IDENTIFY calls of all shards.
+
+    Discord allows ``max_concurrency`` identifies per 5 seconds, one per
+    rate limit key ``shard_id % max_concurrency``. Shards with different keys
+    identify in parallel, shards with the same key wait 5 seconds for each other.
+    Identifies also consume ``session_start_limit.remaining``; once it runs out
+    the scheduler waits for ``reset_after``.
+    """
+
+    def __init__(self, session_start_limit: SessionStartLimitObject) -> None:
+        self.max_concurrency = max(session_start_limit.max_concurrency, 1)
+        self.total = session_start_limit.total
+        self.remaining = session_start_limit.remaining
+        self._reset_at = time.monotonic() + session_start_limit.reset_after / 1000
+
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._last_identify: Dict[int, float] = {}
+        self._quota_lock = asyncio.Lock()
+
+    def rate_limit_key(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    async def acquire(self, shard_id: int) -> None:
+        """Waits until shard is allowed to send IDENTIFY"""
+        key = self.rate_limit_key(shard_id)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            await self._consume_quota(shard_id)
+
+            last_identify = self._last_identify.get(key)
+            if last_identify is not None:
+                delay = last_identify + IDENTIFY_INTERVAL - time.monotonic()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            self._last_identify[key] = time.monotonic()
+
+    async def _consume_quota(self, shard_id: int) -> None:
+        async with self._quota_lock:
+            if self.remaining <= 0:
+                delay = max(self._reset_at - time.monotonic(), 0)
+                logger.warning(
+                    "Session start limit exhausted, shard %s waits %.0f seconds before identifying",
+                    shard_id,
+                    delay
+                )
+
+                await asyncio.sleep(delay)
+                self.remaining = self.total
+                self._reset_at = time.monotonic() + 24 * 60 * 60
+
+            self.remaining -= 1
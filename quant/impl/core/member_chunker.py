@@ -0,0 +1,235 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import secrets
+from typing import AsyncIterator, Dict, Generator, List, Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from quant.impl.core.client import Client
+    from quant.entities.guild import Guild
+    from quant.entities.member import GuildMember
+
+from quant.entities.snowflake import Snowflake, SnowflakeOrInt
+from quant.impl.core.exceptions.library_exception import DiscordException
+from quant.utils.cache.cacheable import CacheableType
+from quant.utils import logger
+
+_CHUNK_TIMEOUT = 30.0
+
+
+class MemberChunkRequest:
+    """Pending REQUEST_GUILD_MEMBERS correlated with GUILD_MEMBERS_CHUNK events by nonce.
+
+    Await it to get all members or iterate it to get members chunk by chunk: ::
+
+        members = await client.fetch_members(guild_id)
+
+        async for chunk in client.fetch_members(guild_id):
+            print(len(chunk))
+    """
+
+    def __init__(
+        self,
+        chunker: MemberChunker,
+        guild_id: SnowflakeOrInt,
+        query: str | None = None,
+        limit: int = 0,
+        presences: bool = False,
+        user_ids: List[SnowflakeOrInt] | None = None,
+        timeout: float = _CHUNK_TIMEOUT
+    ) -> None:
+        self.chunker = chunker
+        self.guild_id = Snowflake(guild_id)
+        self.nonce = secrets.token_hex(16)
+        self.timeout = timeout
+        self.members: List[GuildMember] = []
+        self.not_found: List[Snowflake] = []
+        self.chunk_count: int | None = None
+        self.received_chunks = 0
+
+        self._request_kwargs = {"query": query, "limit": limit, "presences": presences, "user_ids": user_ids}
+        self._chunks: asyncio.Queue[List[GuildMember] | None] = asyncio.Queue()
+        self._started = False
+        self._finished = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    async def _start(self) -> None:
+        if self._started:
+            return
+
+        self._started = True
+        await self.chunker.send(self)
+
+    def feed(self, members: List[GuildMember], chunk_index: int, chunk_count: int, not_found: List[Any]) -> None:
+        self.members.extend(members)
+        self.not_found.extend(Snowflake(user_id) for user_id in not_found)
+        self.chunk_count = chunk_count
+        self.received_chunks += 1
+        self._chunks.put_nowait(members)
+
+        if chunk_index + 1 >= chunk_count:
+            self._finish()
+
+    def _finish(self) -> None:
+        self._finished.set()
+        self._chunks.put_nowait(None)
+
+    async def _collect(self) -> List[GuildMember]:
+        await self._start()
+
+        while not self.done:
+            received = self.received_chunks
+
+            try:
+                await asyncio.wait_for(self._finished.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                # Keep waiting as long as chunks keep coming
+                if self.received_chunks == received:
+                    self.chunker.discard(self)
+                    raise
+
+        return self.members
+
+    def __await__(self) -> Generator[Any, None, List[GuildMember]]:
+        return self._collect().__await__()
+
+    async def __aiter__(self) -> AsyncIterator[List[GuildMember]]:
+        await self._start()
+
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self._chunks.get(), self.timeout)
+            except asyncio.TimeoutError:
+                self.chunker.discard(self)
+                raise
+
+            if chunk is None:
+                return
+
+            yield chunk
+
+
+class MemberChunker:
+    """Sends member requests and dispatches incoming chunks into cache and pending requests"""
+
+    def __init__(self, client: Client) -> None:
+        self.client = client
+        self._requests: Dict[str, MemberChunkRequest] = {}
+        # Guild ID -> (cached guild, its member count when indexed, member ID -> position in guild.members)
+        self._member_indexes: Dict[Snowflake, Tuple[Guild, int, Dict[Snowflake, int]]] = {}
+
+    def request(self, guild_id: SnowflakeOrInt, **kwargs) -> MemberChunkRequest:
+        return MemberChunkRequest(self, guild_id, **kwargs)
+
+    async def send(self, request: MemberChunkRequest) -> None:
+        shard = self.client.shard_for(request.guild_id)
+        if shard is None or shard.gateway is None:
+            raise DiscordException(f"Guild {request.guild_id} shard is not running in this process")
+
+        self._requests[request.nonce] = request
+        await shard.gateway.request_guild_members(request.guild_id, nonce=request.nonce, **request._request_kwargs)
+
+    def discard(self, request: MemberChunkRequest) -> None:
+        self._requests.pop(request.nonce, None)
+
+    async def chunk_guilds(
+        self,
+        guild_ids: List[SnowflakeOrInt] | None = None,
+        concurrency: int = 5,
+        **kwargs
+    ) -> Dict[Snowflake, List[GuildMember]]:
+        """Chunks many guilds with at most ``concurrency`` requests in flight"""
+        if guild_ids is None:
+            guild_ids = [guild.id for guild in self.client.cache.get_guilds()]
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results: Dict[Snowflake, List[GuildMember]] = {}
+
+        async def chunk_guild(guild_id: SnowflakeOrInt) -> None:
+            async with semaphore:
+                try:
+                    results[Snowflake(guild_id)] = await self.request(guild_id, **kwargs)
+                except (asyncio.TimeoutError, DiscordException) as exception:
+                    logger.error("Failed to chunk guild %s: %s", guild_id, exception)
+
+        await asyncio.gather(*(chunk_guild(guild_id) for guild_id in guild_ids))
+        return results
+
+    def handle_chunk(self, payload: Dict[str, Any]) -> None:
+        guild_id = Snowflake(payload["guild_id"])
+        entity_factory = self.client.event_factory.entity_factory
+        members = [entity_factory.deserialize_member(member, guild_id) for member in payload.get("members", [])]
+
+        self._cache_members(guild_id, members)
+
+        request = self._requests.get(payload.get("nonce"))
+        if request is None:
+            return
+
+        chunk_index, chunk_count = payload.get("chunk_index", 0), payload.get("chunk_count", 1)
+        request.feed(members, chunk_index, chunk_count, payload.get("not_found", []))
+
+        if request.done:
+            self.discard(request)
+
+    def _cache_members(self, guild_id: Snowflake, members: List[GuildMember]) -> None:
+        cache = self.client.cache
+
+        if cache.cacheable & CacheableType.USER:
+            for member in members:
+                if member.user is not None:
+                    cache.add_user(member.user)
+
+        if not cache.cacheable & CacheableType.MEMBER:
+            return
+
+        guild = cache.get_guild(guild_id)
+        if guild is None:
+            self._member_indexes.pop(guild_id, None)
+            return
+
+        # Runs in the gateway reader, so only this chunk is walked, not every cached member
+        index = self._member_index(guild)
+        for member in members:
+            if (position := index.get(member.id)) is not None:
+                guild.members[position] = member
+            else:
+                index[member.id] = len(guild.members)
+                guild.members.append(member)
+
+        self._member_indexes[guild_id] = (guild, len(guild.members), index)
+
+    def _member_index(self, guild: Guild) -> Dict[Snowflake, int]:
+        entry = self._member_indexes.get(guild.id)
+
+        # Rebuilt when GUILD_CREATE replaced the guild or its members changed outside the chunker
+        if entry is None or entry[0] is not guild or entry[1] != len(guild.members):
+            return {member.id: position for position, member in enumerate(guild.members)}
+
+        return entry[2]
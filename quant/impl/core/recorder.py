@@ -0,0 +1,232 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import glob
+import gzip
+import os
+import struct
+import time
+from typing import BinaryIO, Final, Iterator, List, Tuple, TYPE_CHECKING
+
+import attrs
+
+if TYPE_CHECKING:
+    from quant.impl.core.client import Client
+
+from quant.impl.core.gateway import Gateway, OpCode, JSON_ENCODING
+from quant.impl.core.compression import ZLIB_STREAM
+from quant.utils import logger
+
+# Wall clock time, record kind, data length
+_RECORD_HEADER = struct.Struct(">dBI")
+
+KIND_BINARY: Final[int] = 0
+KIND_TEXT: Final[int] = 1
+# New websocket connection, compression stream starts over
+KIND_CONNECT: Final[int] = 2
+
+DEFAULT_SEGMENT_SIZE: Final[int] = 64 * 1024 * 1024
+DEFAULT_MAX_SEGMENTS: Final[int] = 10
+
+RecordT = Tuple[float, int, bytes]
+
+
+def _segment_pattern(directory: str, shard_id: int) -> str:
+    return os.path.join(directory, f"shard-{shard_id}-*.qrec.gz")
+
+
+def list_segments(directory: str, shard_id: int = 0) -> List[str]:
+    """Recorded segment files of a shard, oldest first"""
+    return sorted(glob.glob(_segment_pattern(directory, shard_id)))
+
+
+class FrameRecorder:
+    """Appends raw websocket frames of one shard to gzip compressed segment files.
+
+    Segments are rotated after ``max_segment_size`` uncompressed bytes,
+    only the newest ``max_segments`` are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shard_id: int = 0,
+        max_segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        compresslevel: int = 1
+    ) -> None:
+        self.directory = directory
+        self.shard_id = shard_id
+        self.max_segment_size = max_segment_size
+        self.max_segments = max_segments
+        self.compresslevel = compresslevel
+
+        os.makedirs(directory, exist_ok=True)
+
+        existing = list_segments(directory, shard_id)
+        self._segment_index = int(existing[-1].rsplit("-", 1)[1].split(".", 1)[0]) + 1 if existing else 0
+        self._file: BinaryIO | None = None
+        self._written = 0
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"shard-{self.shard_id}-{index:06d}.qrec.gz")
+
+    def _rotate(self) -> None:
+        self.close()
+
+        self._file = gzip.open(self._segment_path(self._segment_index), "wb", compresslevel=self.compresslevel)
+        self._segment_index += 1
+        self._written = 0
+
+        for old_segment in list_segments(self.directory, self.shard_id)[:-self.max_segments]:
+            os.remove(old_segment)
+
+    def _write(self, kind: int, data: bytes) -> None:
+        if self._file is None or self._written >= self.max_segment_size:
+            self._rotate()
+
+        self._file.write(_RECORD_HEADER.pack(time.time(), kind, len(data)))
+        self._file.write(data)
+        self._written += _RECORD_HEADER.size + len(data)
+
+    def record(self, frame: str | bytes) -> None:
+        if isinstance(frame, str):
+            self._write(KIND_TEXT, frame.encode("utf8"))
+        else:
+            self._write(KIND_BINARY, frame)
+
+    def mark_connect(self) -> None:
+        self._write(KIND_CONNECT, b"")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_segments(paths: List[str]) -> Iterator[RecordT]:
+    """Yields ``(timestamp, kind, data)`` records, a truncated last record ends its segment"""
+    for path in paths:
+        with gzip.open(path, "rb") as file:
+            try:
+                while header := file.read(_RECORD_HEADER.size):
+                    if len(header) < _RECORD_HEADER.size:
+                        break
+
+                    timestamp, kind, length = _RECORD_HEADER.unpack(header)
+                    data = file.read(length)
+                    if len(data) < length:
+                        break
+
+                    yield timestamp, kind, data
+            except (EOFError, gzip.BadGzipFile) as exception:
+                logger.warning("Recorded segment %s is truncated: %s", path, exception)
+
+
+@attrs.define(kw_only=True)
+class ReplayStats:
+    frames: int = attrs.field(default=0)
+    skipped: int = attrs.field(default=0)
+    events: int = attrs.field(default=0)
+    bytes: int = attrs.field(default=0)
+    elapsed: float = attrs.field(default=0.0)
+
+    @property
+    def events_per_second(self) -> float:
+        if self.elapsed == 0:
+            return float("nan")
+
+        return self.events / self.elapsed
+
+
+class GatewayReplay:
+    """Feeds recorded frames through the same decode, cache and dispatch path as a live shard.
+
+    ``speed=None`` replays as fast as possible, otherwise frames keep their
+    recorded spacing divided by ``speed``. Compressed frames before the first
+    recorded connection are skipped, their stream state is unknown.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        paths: List[str],
+        shard_id: int = 0,
+        num_shards: int = 1,
+        encoding: str = JSON_ENCODING,
+        compression: str = ZLIB_STREAM
+    ) -> None:
+        self.client = client
+        self.paths = paths
+        self.gateway = Gateway(
+            intents=client.intents,
+            client=client,
+            shard_id=shard_id,
+            num_shards=num_shards,
+            encoding=encoding,
+            compression=compression
+        )
+        self.stats = ReplayStats()
+
+    async def run(self, speed: float | None = None) -> ReplayStats:
+        gateway = self.gateway
+        stats = self.stats
+        synced = False
+        first_timestamp: float | None = None
+        started = time.perf_counter()
+
+        for timestamp, kind, data in read_segments(self.paths):
+            if speed is not None:
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+
+                delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if kind == KIND_CONNECT:
+                gateway.compression.reset()
+                synced = True
+                continue
+
+            if kind == KIND_BINARY and not synced:
+                stats.skipped += 1
+                continue
+
+            stats.frames += 1
+            stats.bytes += len(data)
+
+            payload = gateway.on_websocket_message(data.decode("utf8") if kind == KIND_TEXT else data)
+            if payload is None:
+                continue
+
+            await gateway._handle_dispatch(payload)
+
+            if payload.get("op") == OpCode.DISPATCH:
+                stats.events += 1
+
+        stats.elapsed = time.perf_counter() - started
+        return stats
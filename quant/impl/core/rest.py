@@ -24,7 +24,6 @@ SOFTWARE.
 from __future__ import annotations
 
 import datetime
-import json
 import re
 import warnings
 from typing import List, Any, Dict, Tuple, Final, TYPE_CHECKING, TypeVar
@@ -72,6 +71,7 @@ from quant.entities.poll import Poll
 from quant.entities.locales import DiscordLocale
 from quant.entities.permissions import Permissions
 from quant.utils.cache.cache_manager import CacheManager
+from quant.utils.json_codec import JSONCodec, get_codec
 
 X_AUDIT_LOG_REASON: Final[str] = "X-Audit-Log-Reason"
 AUTHORIZATION_HEADER: Final[Dict[str, str]] = {"Authorization": "{}"}
@@ -81,13 +81,17 @@ AttachmentT = TypeVar("AttachmentT", bound=AttachableURL | File | Attachment)
 
 
 class RESTImpl(RESTAware):
-    def __init__(self, token: str, cache: CacheManager) -> None:
-        self.http = HttpManagerImpl(authorization=token)
+    def __init__(self, token: str, cache: CacheManager, codec: JSONCodec | None = None) -> None:
+        self.codec = get_codec(codec)
+        self.http = HttpManagerImpl(authorization=token, codec=self.codec)
         self.token = token
         self.entity_factory = EntityFactory(cache)
 
         AUTHORIZATION_HEADER["Authorization"] = self.token
 
+    async def _json(self, response: aiohttp.ClientResponse) -> Any:
+        return await response.json(loads=self.codec.loads)
+
     async def execute_webhook(
         self,
         webhook_url: str,
@@ -137,7 +141,7 @@ class RESTImpl(RESTAware):
         webhook_data = await self._request(
             route=route, headers=headers, data=payload
         )
-        return Webhook(**await webhook_data.json())
+        return Webhook(**await self._json(webhook_data))
 
     async def fetch_emoji(self, guild_id: int, emoji: str) -> Emoji:
         if re.match(r"<:(\w+):(\w+)>", emoji):
@@ -153,7 +157,7 @@ class RESTImpl(RESTAware):
                 pre_build_headers=False
             )
 
-            return self.entity_factory.deserialize_emoji(await response.json())
+            return self.entity_factory.deserialize_emoji(await self._json(response))
 
         return self.entity_factory.deserialize_emoji({"name": emoji, "id": Snowflake()})
 
@@ -234,7 +238,7 @@ class RESTImpl(RESTAware):
             headers=AUTHORIZATION_HEADER,
             pre_build_headers=False
         )
-        message_json = await response.json()
+        message_json = await self._json(response)
 
         return self.entity_factory.deserialize_message(message_json)
 
@@ -248,7 +252,7 @@ class RESTImpl(RESTAware):
         data = await self.http.request(
             GuildRoute.GET_GUILD.method, build_guild_url
         )
-        guild_data = await data.json()
+        guild_data = await self._json(data)
         return self.entity_factory.deserialize_guild(guild_data)
 
     async def delete_guild(self, guild_id: int) -> None:
@@ -303,7 +307,7 @@ class RESTImpl(RESTAware):
             body["system_channel_id"] = system_channel_id
 
         data = await self._request(route=route, data=body)
-        return self.entity_factory.deserialize_guild(await data.json())
+        return self.entity_factory.deserialize_guild(await self._json(data))
 
     async def create_guild_ban(
         self,
@@ -433,7 +437,7 @@ class RESTImpl(RESTAware):
         route = MessageRoute.GET_MESSAGE.build(channel_id=channel_id, message_id=message_id)
         raw_message = await self._request(route=route)
 
-        return self.entity_factory.deserialize_message(await raw_message.json())
+        return self.entity_factory.deserialize_message(await self._json(raw_message))
 
     async def create_application_command(
         self,
@@ -468,7 +472,7 @@ class RESTImpl(RESTAware):
         route = InteractionRoute.CREATE_APPLICATION_COMMAND.build(application_id=application_id)
         response = await self._request(route=route, data=body)
 
-        return self.entity_factory.deserialize_application_command(await response.json())
+        return self.entity_factory.deserialize_application_command(await self._json(response))
 
     async def create_guild_application_command(
         self,
@@ -507,7 +511,7 @@ class RESTImpl(RESTAware):
         )
         response = await self._request(route=route, data=body)
 
-        return self.entity_factory.deserialize_application_command(await response.json())
+        return self.entity_factory.deserialize_application_command(await self._json(response))
 
     async def delete_guild_application_command(
         self,
@@ -543,7 +547,7 @@ class RESTImpl(RESTAware):
         )
         response = await self._request(route=route)
 
-        return [self.entity_factory.deserialize_application_command(command) for command in await response.json()]
+        return [self.entity_factory.deserialize_application_command(command) for command in await self._json(response)]
 
     async def fetch_global_application_commands(
         self,
@@ -556,7 +560,7 @@ class RESTImpl(RESTAware):
         )
         response = await self._request(route=route)
 
-        return [self.entity_factory.deserialize_application_command(command) for command in await response.json()]
+        return [self.entity_factory.deserialize_application_command(command) for command in await self._json(response)]
 
     async def fetch_initial_interaction_response(self, application_id: int, interaction_token: str) -> Message:
         route = InteractionRoute.GET_ORIGINAL_INTERACTION_RESPONSE.build(
@@ -564,7 +568,7 @@ class RESTImpl(RESTAware):
         )
         response = await self._request(route=route)
 
-        return self.entity_factory.deserialize_message(await response.json())
+        return self.entity_factory.deserialize_message(await self._json(response))
 
     async def edit_message(
         self,
@@ -588,7 +592,7 @@ class RESTImpl(RESTAware):
         route = MessageRoute.EDIT_MESSAGE.build(channel_id=channel_id, message_id=message_id)
         response = await self._request(route=route, data=payload)
 
-        return self.entity_factory.deserialize_message(await response.json())
+        return self.entity_factory.deserialize_message(await self._json(response))
 
     async def delete_all_reactions(self, channel_id: Snowflake, message_id: Snowflake) -> None:
         route = MessageRoute.DELETE_ALL_REACTIONS.build(channel_id=channel_id, message_id=message_id)
@@ -649,7 +653,7 @@ class RESTImpl(RESTAware):
             )
 
         response = await self._request(route=route, data=payload)
-        return self.entity_factory.deserialize_message(await response.json())
+        return self.entity_factory.deserialize_message(await self._json(response))
 
     async def bulk_overwrite_global_app_commands(
         self, application_id: SnowflakeT, commands: List[ApplicationCommandObject] | None = None
@@ -666,7 +670,7 @@ class RESTImpl(RESTAware):
             data=commands
         )
 
-        return [self.entity_factory.deserialize_application_command(command) for command in await response.json()]
+        return [self.entity_factory.deserialize_application_command(command) for command in await self._json(response)]
 
     async def bulk_overwrite_guild_app_commands(
         self,
@@ -685,7 +689,7 @@ class RESTImpl(RESTAware):
 
         response = await self._request(route=route, data=commands)
 
-        return [self.entity_factory.deserialize_application_command(command) for command in await response.json()]
+        return [self.entity_factory.deserialize_application_command(command) for command in await self._json(response)]
 
     async def fetch_invite(
         self,
@@ -704,7 +708,7 @@ class RESTImpl(RESTAware):
         )
         response = await self._request(route=route)
 
-        return self.entity_factory.deserialize_invite(**await response.json())
+        return self.entity_factory.deserialize_invite(**await self._json(response))
 
     async def delete_invite(self, invite_code: str, reason: str | None = None) -> Invite:
         route = GuildRoute.DELETE_INVITE.build(invite_code=invite_code)
@@ -717,13 +721,13 @@ class RESTImpl(RESTAware):
             route=route, headers=headers, pre_build_headers=False
         )
 
-        return self.entity_factory.deserialize_invite(**await response.json())
+        return self.entity_factory.deserialize_invite(**await self._json(response))
 
     async def fetch_guild_invites(self, guild_id: Snowflake) -> List[Invite]:
         route = GuildRoute.GET_GUILD_INVITES.build(guild_id=guild_id)
         response = await self._request(route=route)
 
-        return [self.entity_factory.deserialize_invite(invite) for invite in await response.json()]
+        return [self.entity_factory.deserialize_invite(invite) for invite in await self._json(response)]
 
     async def fetch_guild_members(
         self,
@@ -737,25 +741,34 @@ class RESTImpl(RESTAware):
         )
         response = await self._request(route=route)
 
-        return [self.entity_factory.deserialize_member(member, guild_id=guild_id) for member in await response.json()]
+        return [
+            self.entity_factory.deserialize_member(member, guild_id=guild_id)
+            for member in await self._json(response)
+        ]
 
     async def fetch_guild_roles(self, guild_id: SnowflakeT) -> List[GuildRole]:
         route = GuildRoute.GET_GUILD_ROLES.build(guild_id=guild_id)
         response = await self._request(route=route)
 
-        return [self.entity_factory.deserialize_role(role) for role in await response.json()]
+        return [self.entity_factory.deserialize_role(role) for role in await self._json(response)]
+
+    async def fetch_current_user(self) -> User:
+        route = UserRoute.GET_CURRENT_USER.build()
+        response = await self._request(route=route)
+
+        return self.entity_factory.deserialize_user(await self._json(response))
 
     async def fetch_user(self, user_id: SnowflakeT) -> User:
         route = UserRoute.GET_USER.build(user_id=user_id)
         response = await self._request(route=route)
 
-        return self.entity_factory.deserialize_user(await response.json())
+        return self.entity_factory.deserialize_user(await self._json(response))
 
     async def fetch_guild_member(self, guild_id: SnowflakeT, user_id: SnowflakeT) -> GuildMember:
         route = GuildRoute.GET_GUILD_MEMBER.build(guild_id=guild_id, user_id=user_id)
         response = await self._request(route=route)
 
-        return self.entity_factory.deserialize_member(await response.json(), guild_id=guild_id)
+        return self.entity_factory.deserialize_member(await self._json(response), guild_id=guild_id)
 
     async def modify_guild_member(
         self,
@@ -795,7 +808,7 @@ class RESTImpl(RESTAware):
             headers[X_AUDIT_LOG_REASON] = reason
 
         response = await self._request(route=route, data=payload, headers=headers, pre_build_headers=False)
-        return self.entity_factory.deserialize_member(await response.json(), guild_id=guild_id)
+        return self.entity_factory.deserialize_member(await self._json(response), guild_id=guild_id)
 
     async def add_guild_member_role(
         self,
@@ -809,7 +822,7 @@ class RESTImpl(RESTAware):
     async def get_gateway(self) -> GatewayInfo:
         route = GatewayRoute.GATEWAY_BOT.build()
         response = await self._request(route=route)
-        payload = await response.json()
+        payload = await self._json(response)
 
         return GatewayInfo(
             url=payload.get("url"),
@@ -831,13 +844,13 @@ class RESTImpl(RESTAware):
             message_id=message_id,
             answer_id=answer_id
         ))
-        users = (await response.json())["users"]
+        users = (await self._json(response))["users"]
         return [self.entity_factory.deserialize_user(user) for user in users]
 
     async def end_poll_immediately(self, channel_id: SnowflakeT, message_id: SnowflakeT) -> Message:
         route = MessageRoute.POST_END_POLL.build(channel_id=channel_id, message_id=message_id)
         response = await self._request(route=route)
-        return self.entity_factory.deserialize_message(await response.json())
+        return self.entity_factory.deserialize_message(await self._json(response))
 
     @staticmethod
     def _parse_emoji(emoji: str | Emoji | SnowflakeT) -> str:
@@ -946,9 +959,9 @@ class RESTImpl(RESTAware):
             body["poll"] = self.entity_factory.serialize_poll(poll)
 
         if payload_json is not None:
-            form_data.add_field("payload_json", json.dumps(payload_json))
+            form_data.add_field("payload_json", self.codec.dumps(payload_json))
         else:
-            form_data.add_field("payload_json", json.dumps(body))
+            form_data.add_field("payload_json", self.codec.dumps(body))
 
         return body, form_data
 
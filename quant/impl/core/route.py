@@ -76,7 +76,7 @@ CDN_AVATARS: Final[str] = "https://cdn.discordapp.com/avatars/{0}/{1}.{2}"
 
 
 class Gateway:
-    OPTIONS: str = "?v={}&encoding=json&compress=zlib-stream".format(_ROUTE_FIELDS.api_version.default)
+    OPTIONS: str = "?v={}&encoding={{encoding}}&compress={{compress}}".format(_ROUTE_FIELDS.api_version.default)
     DISCORD_MAIN_API_URL: Final[str] = "https://discord.com/api/v{}".format(_ROUTE_FIELDS.api_version.default)
     DISCORD_WS_URL: Final[Route] = Route(
         "GET", URI(
@@ -0,0 +1,231 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Final, List, Tuple
+
+import attrs
+
+from quant.impl.core.exceptions.library_exception import DiscordException
+from quant.utils import logger
+
+# Discord closes the connection after 120 sends per 60 seconds
+GATEWAY_SEND_LIMIT: Final[int] = 120
+GATEWAY_SEND_PERIOD: Final[float] = 60.0
+# Sends of every window kept for heartbeats, IDENTIFY and RESUME which bypass the queue
+RESERVED_SENDS: Final[int] = 10
+
+PRIORITY_HIGH: Final[int] = 0
+PRIORITY_NORMAL: Final[int] = 1
+PRIORITY_LOW: Final[int] = 2
+
+_COALESCED = object()
+
+PayloadT = str | bytes
+
+
+@attrs.define(kw_only=True)
+class SendQueueStats:
+    sent: int = attrs.field(default=0)
+    coalesced: int = attrs.field(default=0)
+    total_wait: float = attrs.field(default=0.0)
+    max_wait: float = attrs.field(default=0.0)
+    last_wait: float = attrs.field(default=0.0)
+    depth: int = attrs.field(default=0)
+
+    @property
+    def average_wait(self) -> float:
+        if self.sent == 0:
+            return float("nan")
+
+        return self.total_wait / self.sent
+
+
+class SendWindow:
+    """Sliding window over every frame sent on the socket, queued or not"""
+
+    def __init__(self, limit: int = GATEWAY_SEND_LIMIT, period: float = GATEWAY_SEND_PERIOD) -> None:
+        self.limit = limit
+        self.period = period
+        self._sent: Deque[float] = collections.deque()
+
+    def _expire(self, now: float) -> None:
+        while self._sent and now - self._sent[0] >= self.period:
+            self._sent.popleft()
+
+    @property
+    def used(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._sent)
+
+    def record(self) -> None:
+        self._sent.append(time.monotonic())
+
+    async def wait(self, reserved: int = 0) -> None:
+        """Waits until fewer than ``limit - reserved`` frames were sent in the last period"""
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+
+            if len(self._sent) < self.limit - reserved:
+                return
+
+            await asyncio.sleep(self._sent[0] + self.period - now)
+
+
+class GatewaySendQueue:
+    """Outbound gateway queue limited to Discord's send rate.
+
+    Payloads are sent by priority, then in order. Coalesced payloads
+    (presence updates) keep only the latest value while waiting in the queue.
+    Queued payloads leave ``reserved`` sends of ``window`` to frames bypassing the queue,
+    ``send`` has to record every frame in ``window``.
+    The queue is paused while the shard is not connected.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[PayloadT], Awaitable[None]],
+        window: SendWindow | None = None,
+        reserved: int = RESERVED_SENDS
+    ) -> None:
+        self._send = send
+        self.window = window if window is not None else SendWindow()
+        self.reserved = reserved
+        self._stopped = False
+        self._heap: List[Tuple[int, int, Any, asyncio.Future, float]] = []
+        self._counter = itertools.count()
+        self._coalesced: Dict[Any, Tuple[PayloadT, List[asyncio.Future]]] = {}
+        self._wakeup = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.stats = SendQueueStats()
+
+    @property
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._stopped = False
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stops sending, every waiting :meth:`put` is cancelled"""
+        self._stopped = True
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        for *_, future, _ in self._heap:
+            if not future.done():
+                future.cancel()
+
+        for _, futures in self._coalesced.values():
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+        self._heap.clear()
+        self._coalesced.clear()
+        self.stats.depth = 0
+
+    def pause(self) -> None:
+        self._connected.clear()
+
+    def resume(self) -> None:
+        self._connected.set()
+
+    async def put(self, payload: PayloadT, priority: int = PRIORITY_NORMAL, coalesce_key: Any = None) -> None:
+        """Queues payload and waits until it's sent"""
+        if self._stopped:
+            raise DiscordException("Gateway send queue is stopped")
+
+        future = asyncio.get_running_loop().create_future()
+
+        if coalesce_key is not None:
+            if coalesce_key in self._coalesced:
+                _, futures = self._coalesced[coalesce_key]
+                futures.append(future)
+                self._coalesced[coalesce_key] = (payload, futures)
+                self.stats.coalesced += 1
+                return await future
+
+            self._coalesced[coalesce_key] = (payload, [future])
+            payload = (_COALESCED, coalesce_key)
+
+        heapq.heappush(self._heap, (priority, next(self._counter), payload, future, time.monotonic()))
+        self.stats.depth = len(self._heap)
+        self._wakeup.set()
+
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await self._connected.wait()
+            await self.window.wait(self.reserved)
+
+            if not self._heap:
+                continue
+
+            _, _, payload, future, queued_at = heapq.heappop(self._heap)
+            self.stats.depth = len(self._heap)
+            futures = [future]
+
+            if isinstance(payload, tuple) and payload[0] is _COALESCED:
+                payload, futures = self._coalesced.pop(payload[1])
+
+            try:
+                await self._send(payload)
+            except Exception as exception:
+                logger.error("Gateway queue send failed: %s", exception)
+
+                for pending in futures:
+                    if not pending.done():
+                        pending.set_exception(exception)
+
+                continue
+
+            wait_time = time.monotonic() - queued_at
+            stats = self.stats
+            stats.sent += 1
+            stats.last_wait = wait_time
+            stats.total_wait += wait_time
+            stats.max_wait = max(stats.max_wait, wait_time)
+
+            for pending in futures:
+                if not pending.done():
+                    pending.set_result(None)
@@ -0,0 +1,111 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+import attrs
+
+from quant.utils import logger
+
+
+@attrs.define(kw_only=True)
+class SessionState:
+    shard_id: int = attrs.field()
+    num_shards: int = attrs.field()
+    session_id: str = attrs.field()
+    sequence: int = attrs.field()
+    resume_url: str | None = attrs.field(default=None)
+    saved_at: float = attrs.field(factory=time.time)
+
+
+class SessionStore(ABC):
+    """Keeps shard sessions between process restarts so shards can RESUME instead of IDENTIFY."""
+
+    @abstractmethod
+    def load(self, num_shards: int) -> Dict[int, SessionState]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, states: List[SessionState]) -> None:
+        raise NotImplementedError
+
+
+class FileSessionStore(SessionStore):
+    """Stores sessions in a local JSON file.
+
+    Parameters
+    ==========
+    path: :class:`str`
+        File path
+    max_age: :class:`float`
+        Seconds after which saved sessions are considered expired
+    """
+
+    def __init__(self, path: str = ".quant_sessions.json", max_age: float = 120) -> None:
+        self.path = path
+        self.max_age = max_age
+
+    def load(self, num_shards: int) -> Dict[int, SessionState]:
+        try:
+            with open(self.path, "r") as file:
+                raw_states = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exception:
+            logger.warning("Can't read session store %s: %s", self.path, exception)
+            return {}
+
+        now = time.time()
+        states = {}
+
+        for raw_state in raw_states:
+            try:
+                state = SessionState(**raw_state)
+            except TypeError:
+                continue
+
+            if state.num_shards != num_shards or now - state.saved_at > self.max_age:
+                continue
+
+            states[state.shard_id] = state
+
+        return states
+
+    def scoped(self, name: str) -> FileSessionStore:
+        """Same store in its own file, ``sessions.json`` becomes ``sessions.<name>.json``"""
+        root, extension = os.path.splitext(self.path)
+        return FileSessionStore(f"{root}.{name}{extension}", max_age=self.max_age)
+
+    def save(self, states: List[SessionState]) -> None:
+        temp_path = f"{self.path}.tmp"
+
+        with open(temp_path, "w") as file:
+            json.dump([attrs.asdict(state) for state in states], file)
+
+        os.replace(temp_path, self.path)
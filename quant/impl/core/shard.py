@@ -31,7 +31,14 @@ if TYPE_CHECKING:
 
 from quant.entities.intents import Intents
 from quant.entities.activity import Activity
-from .gateway import Gateway
+from .gateway import Gateway, ResumeStats, OffloadStats, JSON_ENCODING, DEFAULT_OFFLOAD_THRESHOLD
+from .compression import CompressionStats, ZLIB_STREAM
+from .heartbeat import Latency
+from .send_queue import SendQueueStats
+from .dispatch_queue import DispatchQueueStats, DEFAULT_DISPATCH_QUEUE_SIZE, OVERFLOW_BLOCK
+from .session_store import SessionState
+from .supervisor import ShardHealth, ShardState
+from .recorder import FrameRecorder
 
 
 class Shard:
@@ -41,7 +48,16 @@ class Shard:
         shard_id: int,
         intents: Intents = Intents.ALL_UNPRIVILEGED,
         mobile: bool = False,
-        activity: Activity | None = None
+        activity: Activity | None = None,
+        encoding: str = JSON_ENCODING,
+        compression: str = ZLIB_STREAM,
+        compression_stats: bool = False,
+        session_state: SessionState | None = None,
+        dispatch_queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        dispatch_overflow: str = OVERFLOW_BLOCK,
+        offload_threshold: int | None = DEFAULT_OFFLOAD_THRESHOLD,
+        record_directory: str | None = None,
+        gateway_url: str | None = None
     ) -> None:
         self.shard_id = shard_id
         self.num_shards = num_shards
@@ -49,8 +65,15 @@ class Shard:
         self.intents = intents
         self.mobile = mobile
         self.activity = activity
-
-        self._latency: float = float("nan")
+        self.encoding = encoding
+        self.compression = compression
+        self.collect_compression_stats = compression_stats
+        self.session_state = session_state
+        self.dispatch_queue_size = dispatch_queue_size
+        self.dispatch_overflow = dispatch_overflow
+        self.offload_threshold = offload_threshold
+        self.record_directory = record_directory
+        self.gateway_url = gateway_url
 
     async def start(self, client: Client, loop: asyncio.AbstractEventLoop = None) -> None:
         self.gateway = Gateway(
@@ -58,24 +81,103 @@ class Shard:
             shard_id=self.shard_id,
             num_shards=self.num_shards,
             client=client,
-            mobile=self.mobile
+            mobile=self.mobile,
+            encoding=self.encoding,
+            compression=self.compression,
+            compression_stats=self.collect_compression_stats,
+            dispatch_queue_size=self.dispatch_queue_size,
+            dispatch_overflow=self.dispatch_overflow,
+            offload_threshold=self.offload_threshold,
+            recorder=FrameRecorder(self.record_directory, shard_id=self.shard_id) if self.record_directory else None,
+            url=self.gateway_url
         )
 
+        if self.session_state is not None:
+            self.gateway.restore_session(self.session_state)
+
         if loop is not None:
             client.loop = loop
 
-        asyncio.create_task(self.gateway.connect())
+        client.supervisor.supervise(self.gateway)
 
-        if self.shard_id == 0:
+        if self.shard_id == 0 or client.gateway is None:
             client.gateway = self.gateway
 
     async def close(self) -> None:
         asyncio.create_task(self.gateway.close())
 
+    @property
+    def compression_stats(self) -> CompressionStats | None:
+        """Compression ratio and inflate time of this shard, ``None`` unless ``compression_stats`` is enabled"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.compression.stats
+
+    @property
+    def send_queue_stats(self) -> SendQueueStats | None:
+        """Outbound queue depth and wait times of this shard"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.send_queue.stats
+
+    @property
+    def dispatch_queue_stats(self) -> DispatchQueueStats | None:
+        """Inbound event queue depth, drops and receive-to-dispatch lag of this shard"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.dispatch_queue.stats
+
+    @property
+    def offload_stats(self) -> OffloadStats | None:
+        """How many frames were inflated and parsed off the event loop and how long it took"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.offload_stats
+
+    @property
+    def state(self) -> ShardState:
+        if self.gateway is None:
+            return ShardState.DEAD
+
+        return self.health.state
+
+    @property
+    def health(self) -> ShardHealth | None:
+        """Lifecycle state, reconnect count and last error of this shard"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.supervisor.get_health(self.shard_id)
+
+    @property
+    def ready_time(self) -> float | None:
+        """Seconds from the first connection attempt to READY"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.ready_time
+
+    @property
+    def resume_stats(self) -> ResumeStats | None:
+        """RESUME attempts, successes and failures of this shard"""
+        if self.gateway is None:
+            return
+
+        return self.gateway.resume_stats
+
     @property
     def latency(self) -> float:
-        return self._latency
+        """Last heartbeat round trip in seconds, NaN until the first ACK"""
+        return self.latency_stats.last
+
+    @property
+    def latency_stats(self) -> Latency:
+        """Last, median and 99th percentile heartbeat round trip in seconds"""
+        if self.gateway is None:
+            return Latency()
 
-    @latency.setter
-    def latency(self, value: float) -> None:
-        self._latency = value
+        return self.gateway.latency
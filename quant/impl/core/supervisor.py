@@ -0,0 +1,198 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import enum
+import random
+import time
+from typing import Dict, Final, Set, TYPE_CHECKING
+
+import attrs
+
+if TYPE_CHECKING:
+    from quant.impl.core.gateway import Gateway
+
+from quant.utils import logger
+
+RECONNECT_BASE_DELAY: Final[float] = 1.0
+RECONNECT_MAX_DELAY: Final[float] = 60.0
+
+
+class ShardState(enum.Enum):
+    CONNECTING = "connecting"
+    IDENTIFYING = "identifying"
+    RESUMING = "resuming"
+    READY = "ready"
+    DEAD = "dead"
+
+
+@attrs.define(kw_only=True)
+class ShardHealth:
+    shard_id: int = attrs.field()
+    state: ShardState = attrs.field(default=ShardState.CONNECTING)
+    since: float = attrs.field(factory=time.monotonic)
+    connects: int = attrs.field(default=0)
+    consecutive_failures: int = attrs.field(default=0)
+    last_error: str | None = attrs.field(default=None)
+
+    @property
+    def healthy(self) -> bool:
+        return self.state is ShardState.READY
+
+    @property
+    def reconnects(self) -> int:
+        return max(self.connects - 1, 0)
+
+
+class ShardSupervisor:
+    """Owns connection lifecycle of every shard in this process.
+
+    Reconnects wait ``uniform(0, min(max_delay, base_delay * 2 ** failures))``
+    seconds, so shards dropped by the same upstream blip don't come back at once,
+    and at most ``max_concurrent_reconnects`` shards reconnect at the same time.
+    A shard holds its reconnect slot until it's READY again or the attempt fails.
+    If the connection task crashes it is restarted.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_reconnects: int | None = None,
+        base_delay: float = RECONNECT_BASE_DELAY,
+        max_delay: float = RECONNECT_MAX_DELAY
+    ) -> None:
+        self.max_concurrent_reconnects = max_concurrent_reconnects
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.health: Dict[int, ShardHealth] = {}
+
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._holding: Set[int] = set()
+
+    @property
+    def healthy(self) -> bool:
+        """Whether every supervised shard is READY"""
+        return bool(self.health) and all(health.healthy for health in self.health.values())
+
+    def get_health(self, shard_id: int) -> ShardHealth:
+        if shard_id not in self.health:
+            self.health[shard_id] = ShardHealth(shard_id=shard_id)
+
+        return self.health[shard_id]
+
+    def supervise(self, gateway: Gateway) -> asyncio.Task:
+        shard_id = gateway.identify.shard[0]
+        self.get_health(shard_id)
+
+        task = gateway.loop.create_task(self._run(gateway))
+        self._tasks[shard_id] = task
+        return task
+
+    async def _run(self, gateway: Gateway) -> None:
+        shard_id = gateway.identify.shard[0]
+
+        while True:
+            try:
+                await gateway.connect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error("Shard %s connection task crashed: %s", shard_id, exception)
+                self.failed(shard_id, exception)
+
+                if gateway.websocket is not None and not gateway.websocket.closed:
+                    await gateway.websocket.close()
+
+                continue
+
+            return
+
+    def set_state(self, shard_id: int, state: ShardState) -> None:
+        health = self.get_health(shard_id)
+        if health.state is state:
+            return
+
+        health.state = state
+        health.since = time.monotonic()
+
+        if state is ShardState.READY:
+            health.consecutive_failures = 0
+            health.last_error = None
+
+        if state in (ShardState.READY, ShardState.DEAD):
+            self._release(shard_id)
+
+    def failed(self, shard_id: int, error: BaseException | str | None = None) -> None:
+        """Connection attempt ended before the shard became READY"""
+        health = self.get_health(shard_id)
+        health.consecutive_failures += 1
+
+        if error is not None:
+            health.last_error = str(error)
+
+        self._release(shard_id)
+
+    def disconnected(self, shard_id: int, close_code: int | None = None) -> None:
+        if self.get_health(shard_id).state is not ShardState.READY:
+            self.failed(shard_id, f"closed with code {close_code} before ready")
+            return
+
+        self._release(shard_id)
+
+    def backoff(self, shard_id: int) -> float:
+        failures = self.get_health(shard_id).consecutive_failures
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** failures))
+
+    async def before_connect(self, shard_id: int) -> None:
+        """Waits for backoff and a free reconnect slot, first connect goes straight through"""
+        health = self.get_health(shard_id)
+        health.connects += 1
+
+        if health.connects == 1:
+            return
+
+        delay = self.backoff(shard_id)
+        logger.info("Shard %s reconnects in %.2f seconds", shard_id, delay)
+        await asyncio.sleep(delay)
+
+        if self.max_concurrent_reconnects is None:
+            return
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent_reconnects)
+
+        await self._slots.acquire()
+        self._holding.add(shard_id)
+
+    def _release(self, shard_id: int) -> None:
+        if shard_id in self._holding:
+            self._holding.discard(shard_id)
+            self._slots.release()
+
+    def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+        self._tasks.clear()
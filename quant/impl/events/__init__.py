@@ -32,6 +32,7 @@ __all__ = (
     "ChannelCreateEvent",
     "VoiceStateUpdateEvent",
     "GuildCreateEvent",
+    "GuildAvailableEvent",
     "MessageCreateEvent",
     "MessageDeleteEvent",
     "ReactionRemoveEvent",
@@ -21,7 +21,7 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from .guild_create_event import GuildCreateEvent
+from .guild_create_event import GuildCreateEvent, GuildAvailableEvent
 from .message_event import MessageCreateEvent, MessageEditEvent, MessageDeleteEvent
 from .reaction_event import ReactionAddEvent, ReactionRemoveEvent
 from .voice_server_update_event import VoiceServerUpdateEvent
@@ -32,6 +32,7 @@ from .member_event import MemberLeaveEvent, MemberJoinEvent
 
 __all__ = (
     "GuildCreateEvent",
+    "GuildAvailableEvent",
     "MessageEditEvent",
     "MessageCreateEvent",
     "MessageDeleteEvent",
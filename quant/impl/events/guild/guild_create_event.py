@@ -32,7 +32,7 @@ if TYPE_CHECKING:
     from quant.entities.guild import Guild
 
 from quant.impl.events.types import EventTypes
-from quant.impl.events.event import DiscordEvent
+from quant.impl.events.event import DiscordEvent, InternalEvent
 
 
 @attrs.define(kw_only=True)
@@ -45,3 +45,17 @@ class GuildCreateEvent(DiscordEvent):
         self.cache_manager.add_guild(self.guild)
 
         return self
+
+
+@attrs.define(kw_only=True)
+class GuildAvailableEvent(InternalEvent):
+    """Fired after GUILD_CREATE once the guild with all its channels and members is cached"""
+    guild: Guild = attrs.field(default=None)
+
+    @staticmethod
+    def build(event: GuildAvailableEvent, *args, **kwargs) -> GuildAvailableEvent:
+        event.guild = args[0]
+        return event
+
+    def emit(self, *args, **kwargs):
+        return self
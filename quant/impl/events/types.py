@@ -52,6 +52,7 @@ class EventTypes(_DynamicEnum):
     VOICE_STATE_UPDATE: Final[str] = "VOICE_STATE_UPDATE"
     VOICE_SERVER_UPDATE: Final[str] = "VOICE_SERVER_UPDATE"
     CHANNEL_CREATE: Final[str] = "CHANNEL_CREATE"
+    CHANNEL_DELETE: Final[str] = "CHANNEL_DELETE"
     PRESENCE_UPDATE: Final[str] = "PRESENCE_UPDATE"
     TYPING_START: Final[str] = "TYPING_START"
     GUILD_MEMBER_ADD: Final[str] = "GUILD_MEMBER_ADD"
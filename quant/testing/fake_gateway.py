@@ -0,0 +1,351 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import itertools
+import json
+import secrets
+import zlib
+from typing import Any, Callable, Dict, List, Set
+
+import attrs
+from aiohttp import web, WSMsgType
+
+from quant.impl.core import etf
+from quant.impl.core.compression import ZLIB_STREAM, ZSTD_STREAM
+from quant.impl.core.exceptions.library_exception import DiscordException
+from quant.impl.core.gateway import OpCode
+from quant.utils import logger
+
+_GUILD_INDEX_BASE = 1 << 20
+_MESSAGE_ID_BASE = 1 << 50
+
+
+def fake_token(client_id: int = 1) -> str:
+    """Token shaped like a real one, :class:`Client` reads its bot ID from the first part"""
+    encoded_id = base64.b64encode(str(client_id).encode()).decode().rstrip("=")
+    return f"{encoded_id}.fake.{secrets.token_hex(8)}"
+
+
+@attrs.define(kw_only=True)
+class FakeGatewayStats:
+    connections: int = attrs.field(default=0)
+    identifies: int = attrs.field(default=0)
+    resumes: int = attrs.field(default=0)
+    heartbeats: int = attrs.field(default=0)
+    events_sent: int = attrs.field(default=0)
+
+
+def _zlib_stream() -> Callable[[bytes], bytes]:
+    compressor = zlib.compressobj()
+    return lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _zstd_stream() -> Callable[[bytes], bytes]:
+    try:
+        import zstandard
+    except ImportError as exception:
+        raise DiscordException("zstandard is not installed, run `pip install zstandard`") from exception
+
+    compressor = zstandard.ZstdCompressor().compressobj()
+    # Flushed after every message like Discord does, one frame inflates to one payload
+    return lambda data: compressor.compress(data) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+_COMPRESSORS: Dict[str, Callable[[], Callable[[bytes], bytes]]] = {
+    ZLIB_STREAM: _zlib_stream,
+    ZSTD_STREAM: _zstd_stream
+}
+
+
+class _Connection:
+    def __init__(
+        self,
+        websocket: web.WebSocketResponse,
+        encoding: str,
+        compress: Callable[[bytes], bytes] | None
+    ) -> None:
+        self.websocket = websocket
+        self.encoding = encoding
+        self._compress = compress
+        self.session_id: str | None = None
+        self.firehose: asyncio.Task | None = None
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        if self.encoding == "etf":
+            data = etf.dumps(payload)
+        else:
+            data = json.dumps(payload, separators=(",", ":"))
+
+        if self._compress is None:
+            if isinstance(data, bytes):
+                await self.websocket.send_bytes(data)
+            else:
+                await self.websocket.send_str(data)
+            return
+
+        if isinstance(data, str):
+            data = data.encode("utf8")
+
+        await self.websocket.send_bytes(self._compress(data))
+
+
+class FakeGateway:
+    """Local websocket server speaking enough of the Discord gateway protocol for load tests.
+
+    Handles HELLO, IDENTIFY, READY, heartbeat ACK, RESUME and INVALID_SESSION,
+    :meth:`reconnect_all` and :meth:`invalidate_all` push RECONNECT and
+    INVALID_SESSION to connected shards. After READY every shard gets
+    ``guild_count`` GUILD_CREATE events and then MESSAGE_CREATE events
+    at ``events_per_second`` (``None`` sends as fast as possible). ::
+
+        async with FakeGateway(guild_count=10, events_per_second=5000) as gateway:
+            client = Client(fake_token(), gateway_url=gateway.url, sync_commands=False)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        heartbeat_interval: int = 41250,
+        guild_count: int = 1,
+        members_per_guild: int = 10,
+        channels_per_guild: int = 5,
+        events_per_second: float | None = 1000,
+        message_count: int | None = None
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.heartbeat_interval = heartbeat_interval
+        self.guild_count = guild_count
+        self.members_per_guild = members_per_guild
+        self.channels_per_guild = channels_per_guild
+        self.events_per_second = events_per_second
+        self.message_count = message_count
+        self.stats = FakeGatewayStats()
+
+        self._runner: web.AppRunner | None = None
+        self._connections: Set[_Connection] = set()
+        # Session ID -> last sent sequence
+        self._sessions: Dict[str, int] = {}
+        self._session_shards: Dict[str, List[int]] = {}
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        # Port 0 picks a free port
+        self.port = self._runner.addresses[0][1]
+        logger.info("Fake gateway listening on %s", self.url)
+
+    async def stop(self) -> None:
+        for connection in list(self._connections):
+            if connection.firehose is not None:
+                connection.firehose.cancel()
+
+            await connection.websocket.close()
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeGateway:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    async def reconnect_all(self) -> None:
+        """Asks every connected shard to reconnect and resume"""
+        for connection in list(self._connections):
+            await connection.send({"op": OpCode.RECONNECT, "d": None})
+
+    async def invalidate_all(self, resumable: bool = False) -> None:
+        for connection in list(self._connections):
+            if not resumable and connection.session_id is not None:
+                self._sessions.pop(connection.session_id, None)
+                self._session_shards.pop(connection.session_id, None)
+
+            if connection.firehose is not None:
+                connection.firehose.cancel()
+
+            await connection.send({"op": OpCode.INVALID_SESSION, "d": resumable})
+
+    async def drop_all(self, code: int = 1006) -> None:
+        """Closes every connection like an upstream outage would"""
+        for connection in list(self._connections):
+            await connection.websocket.close(code=code)
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        compression = request.query.get("compress")
+        compress = None
+
+        if compression:
+            if compression not in _COMPRESSORS:
+                raise web.HTTPBadRequest(text=f"Unsupported compression: {compression}")
+
+            compress = _COMPRESSORS[compression]()
+
+        websocket = web.WebSocketResponse(max_msg_size=0)
+        await websocket.prepare(request)
+
+        connection = _Connection(websocket, encoding=request.query.get("encoding", "json"), compress=compress)
+        self._connections.add(connection)
+        self.stats.connections += 1
+
+        try:
+            await connection.send({"op": OpCode.HELLO, "d": {"heartbeat_interval": self.heartbeat_interval}})
+
+            async for message in websocket:
+                if message.type == WSMsgType.TEXT:
+                    payload = json.loads(message.data)
+                elif message.type == WSMsgType.BINARY:
+                    payload = etf.loads(message.data)
+                else:
+                    break
+
+                await self._handle_payload(connection, payload)
+        finally:
+            if connection.firehose is not None:
+                connection.firehose.cancel()
+
+            self._connections.discard(connection)
+
+        return websocket
+
+    async def _handle_payload(self, connection: _Connection, payload: Dict[str, Any]) -> None:
+        opcode, data = payload.get("op"), payload.get("d")
+
+        match opcode:
+            case OpCode.HEARTBEAT:
+                self.stats.heartbeats += 1
+                await connection.send({"op": OpCode.HEARTBEAT_ACK, "d": None})
+            case OpCode.IDENTIFY:
+                if connection.firehose is not None:
+                    connection.firehose.cancel()
+
+                self.stats.identifies += 1
+                connection.session_id = secrets.token_hex(16)
+                shard = data.get("shard", [0, 1])
+                self._sessions[connection.session_id] = 0
+                self._session_shards[connection.session_id] = shard
+
+                guilds = [{"id": str(guild_id), "unavailable": True} for guild_id in self._guild_ids(*shard)]
+                await self._dispatch(connection, "READY", {
+                    "v": 10,
+                    "user": {"id": "1", "username": "quant", "bot": True},
+                    "guilds": guilds,
+                    "session_id": connection.session_id,
+                    "resume_gateway_url": self.url,
+                    "shard": shard
+                })
+                connection.firehose = asyncio.create_task(self._firehose(connection, shard, send_guilds=True))
+            case OpCode.RESUME:
+                session_id = data.get("session_id")
+                if session_id not in self._sessions:
+                    await connection.send({"op": OpCode.INVALID_SESSION, "d": False})
+                    return
+
+                self.stats.resumes += 1
+                connection.session_id = session_id
+                await self._dispatch(connection, "RESUMED", {})
+                shard = self._session_shards[session_id]
+                connection.firehose = asyncio.create_task(self._firehose(connection, shard, send_guilds=False))
+
+    async def _dispatch(self, connection: _Connection, event_name: str, data: Dict[str, Any]) -> None:
+        sequence = self._sessions[connection.session_id] + 1
+        self._sessions[connection.session_id] = sequence
+
+        await connection.send({"t": event_name, "s": sequence, "op": OpCode.DISPATCH, "d": data})
+        self.stats.events_sent += 1
+
+    def _guild_ids(self, shard_id: int, num_shards: int) -> List[int]:
+        # Guild IDs whose (id >> 22) % num_shards lands on this shard
+        return [
+            ((_GUILD_INDEX_BASE + index) * num_shards + shard_id) << 22
+            for index in range(self.guild_count)
+        ]
+
+    def _guild_payload(self, guild_id: int) -> Dict[str, Any]:
+        channels = [
+            {"id": str(guild_id + index + 1), "type": 0, "name": f"channel-{index}", "guild_id": str(guild_id)}
+            for index in range(self.channels_per_guild)
+        ]
+        members = [
+            {"user": {"id": str(guild_id + 1000 + index), "username": f"member-{index}"}, "roles": []}
+            for index in range(self.members_per_guild)
+        ]
+
+        return {
+            "id": str(guild_id),
+            "name": f"guild-{guild_id}",
+            "owner_id": "1",
+            "member_count": self.members_per_guild,
+            "large": self.members_per_guild > 250,
+            "channels": channels,
+            "members": members,
+            "roles": [],
+            "emojis": []
+        }
+
+    async def _firehose(self, connection: _Connection, shard: List[int], send_guilds: bool) -> None:
+        try:
+            guild_ids = self._guild_ids(*shard)
+
+            if send_guilds:
+                for guild_id in guild_ids:
+                    await self._dispatch(connection, "GUILD_CREATE", self._guild_payload(guild_id))
+
+            delay = 1 / self.events_per_second if self.events_per_second else 0
+            counter = range(self.message_count) if self.message_count is not None else itertools.count()
+
+            for index in counter:
+                guild_id = guild_ids[index % len(guild_ids)]
+                await self._dispatch(connection, "MESSAGE_CREATE", {
+                    "id": str(_MESSAGE_ID_BASE + index),
+                    "type": 0,
+                    "channel_id": str(guild_id + 1),
+                    "guild_id": str(guild_id),
+                    "author": {"id": str(guild_id + 1000), "username": "member-0"},
+                    "content": f"message {index}",
+                    "timestamp": "2024-01-01T00:00:00+00:00"
+                })
+
+                # Sleeping 0 still lets heartbeats and other connections through
+                await asyncio.sleep(delay)
+        except (ConnectionResetError, asyncio.CancelledError):
+            return
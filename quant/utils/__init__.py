@@ -26,11 +26,17 @@ import logging
 from quant.impl.core.exceptions.command_exceptions import NotEnoughPermissions
 from quant.entities.permissions import Permissions
 from quant.utils.cache.cacheable import CacheableType
+from quant.utils.json_codec import JSONCodec, StdlibJSONCodec, OrjsonCodec, UjsonCodec, get_codec
 
 __all__ = (
     "has_permissions",
     "logger",
-    "CacheableType"
+    "CacheableType",
+    "JSONCodec",
+    "StdlibJSONCodec",
+    "OrjsonCodec",
+    "UjsonCodec",
+    "get_codec"
 )
 
 
@@ -23,6 +23,7 @@ SOFTWARE.
 """
 from __future__ import annotations
 
+import asyncio
 from typing import List, TYPE_CHECKING, Dict, TypeVar
 
 if TYPE_CHECKING:
@@ -79,6 +80,18 @@ class CacheManager:
     def add_role(self, role: GuildRole):
         self.__cached_roles[role.id] = role
 
+    def remove_guild(self, guild_id: SnowflakeOrInt) -> Guild | None:
+        """Removes guild from cache."""
+        return self.__cached_guilds.pop(guild_id, None)
+
+    def remove_message(self, message_id: SnowflakeOrInt) -> Message | None:
+        """Removes message from cache."""
+        return self.__cached_messages.pop(message_id, None)
+
+    def remove_channel(self, channel_id: SnowflakeOrInt) -> Channel | None:
+        """Removes channel from cache."""
+        return self.__cached_channels.pop(channel_id, None)
+
     def get_user(self, user_id: SnowflakeOrInt) -> User | None:
         """Get user from cache."""
         if user_id not in self.__cached_users:
@@ -190,11 +203,60 @@ class CacheHandlers(CacheManager):
             for member in guild_object.members:
                 self.add_user(member.user)
 
+    async def handle_guild_incremental(self, slice_size: int, **kwargs) -> None:
+        """Same as :meth:`handle_guild`, but channels and members are deserialized
+        ``slice_size`` at a time with a yield to the event loop after every slice.
+
+        Guild is cached before its channels and members with ``partial=True``.
+        """
+        if not self.cacheable & CacheableType.GUILD:
+            return
+
+        guild_object = self.entity_factory.deserialize_guild({**kwargs, "channels": []})
+        guild_object.partial = True
+        self.add_guild(guild_object)
+
+        if self.cacheable & CacheableType.ROLE:
+            for role in guild_object.roles:
+                self.add_role(role)
+
+        if self.cacheable & CacheableType.EMOJI:
+            for emoji in guild_object.emojis:
+                self.add_emoji(emoji)
+
+        channels = kwargs.get("channels", [])
+        for start in range(0, len(channels), slice_size):
+            for channel_data in channels[start:start + slice_size]:
+                channel = self.entity_factory.deserialize_guild_channel(channel_data)
+                guild_object.channels.append(channel)
+
+                if self.cacheable & CacheableType.CHANNEL:
+                    self.add_channel(channel)
+
+            await asyncio.sleep(0)
+
+        guild_id = Snowflake(guild_object.id)
+        members = kwargs.get("members", [])
+        for start in range(0, len(members), slice_size):
+            for member_data in members[start:start + slice_size]:
+                member = self.entity_factory.deserialize_member(member_data, guild_id)
+                guild_object.members.append(member)
+
+                if self.cacheable & CacheableType.USER:
+                    self.add_user(member.user)
+
+            await asyncio.sleep(0)
+
+        guild_object.partial = False
+
     def handle_guild_delete(self, **kwargs) -> None:
-        guild_id = Snowflake(kwargs.get("id"))
+        self.remove_guild(Snowflake(kwargs.get("id")))
+
+    def handle_message_delete(self, **kwargs) -> None:
+        self.remove_message(Snowflake(kwargs.get("id")))
 
-        if guild_id in self.__cached_guilds:
-            del self.__cached_guilds[Snowflake(kwargs["id"])]
+    def handle_channel_delete(self, **kwargs) -> None:
+        self.remove_channel(Snowflake(kwargs.get("id")))
 
     def handle_voice_state_update(self, **kwargs) -> None:
         state = self.entity_factory.deserialize_voice_state(kwargs)
@@ -8,5 +8,6 @@ class CacheableType(enum.IntFlag):
     MESSAGE = 1 << 4
     EMOJI = 1 << 5
     CHANNEL = 1 << 6
+    MEMBER = 1 << 7
 
-    ALL = USER | ROLE | GUILD | MESSAGE | EMOJI | CHANNEL
+    ALL = USER | ROLE | GUILD | MESSAGE | EMOJI | CHANNEL | MEMBER
@@ -0,0 +1,135 @@
+"""
+MIT License
+
+Copyright (c) 2024 MagM1go
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Type
+
+from quant.impl.core.exceptions.library_exception import DiscordException
+
+JSONDataT = bytes | bytearray | memoryview | str
+
+
+class JSONCodec(ABC):
+    """Base class for JSON backends used by gateway and REST."""
+    name: str = "abstract"
+
+    @abstractmethod
+    def loads(self, data: JSONDataT) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> str:
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "json"
+
+    def loads(self, data: JSONDataT) -> Any:
+        # json.loads(bytes) sniffs the encoding and decodes with "surrogatepass",
+        # which is noticeably slower than a plain utf8 decode
+        if not isinstance(data, str):
+            data = str(data, "utf8")
+
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError as exception:
+            raise DiscordException("orjson is not installed, run `pip install orjson`") from exception
+
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+
+    def loads(self, data: JSONDataT) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj).decode("utf8")
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        try:
+            import ujson
+        except ImportError as exception:
+            raise DiscordException("ujson is not installed, run `pip install ujson`") from exception
+
+        self._loads = ujson.loads
+        self._dumps = ujson.dumps
+
+    def loads(self, data: JSONDataT) -> Any:
+        if isinstance(data, memoryview | bytearray):
+            data = bytes(data)
+
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj, ensure_ascii=False)
+
+
+_CODECS: Dict[str, Type[JSONCodec]] = {
+    StdlibJSONCodec.name: StdlibJSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec
+}
+
+
+def get_codec(codec: JSONCodec | str | None = None) -> JSONCodec:
+    """Resolve codec instance by name
+
+    ``"auto"`` picks the fastest installed backend (orjson, then ujson, then stdlib json).
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is None:
+        return StdlibJSONCodec()
+
+    if codec == "auto":
+        for codec_type in (OrjsonCodec, UjsonCodec):
+            try:
+                return codec_type()
+            except DiscordException:
+                continue
+
+        return StdlibJSONCodec()
+
+    codec_type = _CODECS.get(codec)
+    if codec_type is None:
+        raise DiscordException(f"Unknown JSON codec: {codec}. Available: {', '.join(_CODECS)}, auto")
+
+    return codec_type()